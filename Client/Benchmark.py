@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from NetUtils import Endpoint, NetworkItem
+
+from .. import SSClient
+from ..Constants import *
+from ..Items import ITEM_TABLE, LOOKUP_ID_TO_NAME
+from ..Locations import SSLocation
+from .FakeDolphin import SSFakeDolphin
+from .Flags import LOCATION_FLAG_CHECKS
+from .Perf import percentile
+
+
+class SSBenchServer:
+    """
+    Stand-in for the websocket to the Archipelago server.
+
+    Messages the client sends are answered the way the server would answer them, and the time each one arrives is
+    recorded.
+    """
+
+    def __init__(self, ctx: "SSClient.SSContext"):
+        """
+        Create the stand-in server.
+
+        :param ctx: The SS client context connected to it.
+        """
+        self.ctx = ctx
+        self.open: bool = True
+        self.closed: bool = False
+        # (time received, message) for every message the client sent.
+        self.received: list[tuple[float, dict[str, Any]]] = []
+
+    async def send(self, data: str) -> None:
+        """
+        Receive a frame from the client.
+
+        :param data: The encoded messages.
+        """
+        now = time.perf_counter()
+        ctx = self.ctx
+        for msg in json.loads(data):
+            self.received.append((now, msg))
+            if msg["cmd"] == "LocationChecks":
+                new_locations = set(msg["locations"]) - ctx.checked_locations
+                ctx.checked_locations |= new_locations
+                ctx.missing_locations -= new_locations
+                asyncio.get_running_loop().call_soon(
+                    ctx.on_package, "RoomUpdate", {"cmd": "RoomUpdate", "checked_locations": sorted(new_locations)}
+                )
+
+    def first(self, predicate: Callable[[dict[str, Any]], bool]) -> Optional[float]:
+        """
+        Find when the first message matching a predicate arrived.
+
+        :param predicate: Check for the message.
+        :return: The time it arrived, or `None` if it hasn't.
+        """
+        return next((received for received, msg in self.received if predicate(msg)), None)
+
+
+def make_context(fake: SSFakeDolphin, slots: int = GIVE_ITEM_ARRAY_LENGTH) -> "SSClient.SSContext":
+    """
+    Create a client context that is connected to a stand-in server, with every location in the seed still missing.
+
+    :param fake: The fake Dolphin the client reads from.
+    :param slots: Number of slots in the give item array.
+    :return: The client context.
+    """
+    ctx = SSClient.SSContext(None, None)
+    ctx.server = Endpoint(SSBenchServer(ctx))
+    ctx.slot = 1
+    ctx.team = 0
+    ctx.player_names = {1: "Bench"}
+    ctx.checked_locations = set()
+    ctx.missing_locations = {SSLocation.get_apid(code) for code in LOCATION_FLAG_CHECKS.id_to_flags if code is not None}
+    ctx.len_give_item_array = fake.give_item_array_length = slots
+    ctx.reset_location_checks()
+    return ctx
+
+
+def set_location_flags(fake: SSFakeDolphin, code: int) -> None:
+    """
+    Set the flags that check a location.
+
+    :param fake: The fake Dolphin.
+    :param code: The location's code.
+    """
+    for offset, mask in LOCATION_FLAG_CHECKS.id_to_flags[code]:
+        if offset < STORYFLAG_BLOCK_SIZE:
+            fake.set_flag(STORYFLAG_BLOCK_ADDR + offset, mask)
+        else:
+            fake.set_flag(SCENEFLAG_BLOCK_ADDR + offset - STORYFLAG_BLOCK_SIZE, mask)
+
+
+async def wait_until(predicate: Callable[[], bool], timeout: float) -> bool:
+    """
+    Wait until a condition is met.
+
+    :param predicate: The condition.
+    :param timeout: Seconds to wait at most.
+    :return: `True` if the condition was met, otherwise `False`.
+    """
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() >= deadline:
+            return False
+        await asyncio.sleep(0.001)
+    return True
+
+
+async def run_client(
+    fake: SSFakeDolphin, ctx: "SSClient.SSContext", speed: float, bench: Callable[[], Awaitable[dict[str, Any]]]
+) -> dict[str, Any]:
+    """
+    Run the client's sync loop and item delivery against the fake Dolphin while a benchmark runs.
+
+    :param fake: The fake Dolphin.
+    :param ctx: The client context.
+    :param speed: How many times faster than real time the game runs.
+    :param bench: The benchmark.
+    :return: The benchmark's result.
+    """
+    tasks = [
+        asyncio.create_task(fake.run(speed)),
+        asyncio.create_task(SSClient.dolphin_sync_task(ctx)),
+        asyncio.create_task(SSClient.item_delivery_task(ctx)),
+    ]
+    try:
+        return await bench()
+    finally:
+        ctx.exit_event.set()
+        tasks[0].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def bench_check_locations(checked: int, duration: float) -> dict[str, Any]:
+    """
+    Measure how many location checks the client can do per second.
+
+    :param checked: Number of locations already checked.
+    :param duration: Seconds to run each measurement for.
+    :return: Ticks per second when no flag changes and when every tick rescans all unresolved locations.
+    """
+    fake = SSFakeDolphin()
+    SSClient.use_memory_backend(fake)
+    fake.hook()
+    ctx = make_context(fake)
+    codes = [code for code in LOCATION_FLAG_CHECKS.id_to_flags if code is not None]
+    for code in codes[:checked]:
+        set_location_flags(fake, code)
+
+    async def tick() -> None:
+        SSClient.dme_cache.invalidate()
+        await SSClient.dme_prefetch(ctx, flags=True)
+        await SSClient.check_locations(ctx)
+
+    # Send and resolve the checked locations first, so only the steady state is timed.
+    await tick()
+    await asyncio.sleep(0)
+
+    result = {"benchmark": "check_locations", "checked": checked}
+    for name, full_scan in (("ticks_per_second", False), ("full_scan_ticks_per_second", True)):
+        ticks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            if full_scan:
+                ctx.last_flag_snapshot = None
+            await tick()
+            ticks += 1
+        result[name] = ticks / (time.perf_counter() - start)
+    SSClient.dme_cache.invalidate()
+    return result
+
+
+async def bench_drain_items(count: int, slots: int, speed: float, timeout: float) -> dict[str, Any]:
+    """
+    Measure how long it takes to give the player a backlog of received items.
+
+    :param count: Number of items in the backlog.
+    :param slots: Number of slots in the give item array.
+    :param speed: How many times faster than real time the game runs.
+    :param timeout: Seconds to wait at most.
+    :return: The time taken, in seconds and in game frames.
+    """
+    fake = SSFakeDolphin()
+    SSClient.use_memory_backend(fake)
+    ctx = make_context(fake, slots)
+    item_codes = [code for code, name in LOOKUP_ID_TO_NAME.items() if ITEM_TABLE[name].item_id is not None]
+    items = [NetworkItem(item_codes[idx % len(item_codes)], 0, 1) for idx in range(count)]
+    ctx.on_package("ReceivedItems", {"cmd": "ReceivedItems", "index": 0, "items": items})
+    item_ids = [ITEM_TABLE[LOOKUP_ID_TO_NAME[item.item]].item_id for item in items]
+
+    async def bench() -> dict[str, Any]:
+        start = time.perf_counter()
+        start_frame = fake.frame
+        drained = await wait_until(lambda: len(fake.items_given) >= count, timeout)
+        seconds = time.perf_counter() - start
+        return {
+            "benchmark": "drain_items",
+            "items": count,
+            "slots": slots,
+            "speed": speed,
+            "drained": drained,
+            "in_order": fake.items_given[:count] == item_ids,
+            "seconds": seconds,
+            "frames": fake.frame - start_frame,
+            "items_per_second": len(fake.items_given) / seconds,
+        }
+
+    return await run_client(fake, ctx, speed, bench)
+
+
+async def bench_check_latency(samples: int, interval: float) -> dict[str, Any]:
+    """
+    Measure the time from a location's flag being set in-game to the server receiving the check.
+
+    :param samples: Number of locations to check.
+    :param interval: Seconds between checks.
+    :return: Latency percentiles in milliseconds.
+    """
+    fake = SSFakeDolphin()
+    SSClient.use_memory_backend(fake)
+    ctx = make_context(fake)
+    server: SSBenchServer = ctx.server.socket
+    codes = [code for code in LOCATION_FLAG_CHECKS.id_to_flags if code is not None]
+    # Set each flag at a random point of the location check interval, so the samples aren't all in the same phase.
+    tick = ctx.sync_scheduler.job("locations").interval
+
+    async def bench() -> dict[str, Any]:
+        await wait_until(lambda: ctx.dolphin_status == CONNECTION_CONNECTED_STATUS, 5)
+        latencies = []
+        for code in codes[:samples]:
+            await asyncio.sleep(interval + random.uniform(0, tick))
+            apid = SSLocation.get_apid(code)
+            if apid in ctx.checked_locations:
+                # Already checked by a flag it shares with an earlier location.
+                continue
+            start = time.perf_counter()
+            set_location_flags(fake, code)
+            if await wait_until(lambda: apid in ctx.checked_locations, 5):
+                received = server.first(lambda msg: msg["cmd"] == "LocationChecks" and apid in msg["locations"])
+                latencies.append((received - start) * 1000)
+        return {
+            "benchmark": "check_latency",
+            "samples": len(latencies),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "max_ms": max(latencies, default=0.0),
+        }
+
+    return await run_client(fake, ctx, 1.0, bench)
+
+
+async def bench_deathlink(samples: int) -> dict[str, Any]:
+    """
+    Measure the time from the player dying to the server receiving the death, and from the player dying to the death
+    being given back to them, as if it had been bounced back from another player.
+
+    :param samples: Number of deaths.
+    :return: Latency percentiles in milliseconds.
+    """
+    fake = SSFakeDolphin()
+    SSClient.use_memory_backend(fake)
+    ctx = make_context(fake)
+    ctx.tags = {"DeathLink"}
+    server: SSBenchServer = ctx.server.socket
+
+    def dead() -> bool:
+        return fake.peek(CURR_HEALTH_ADDR, 2) == b"\x00\x00"
+
+    async def bench() -> dict[str, Any]:
+        await wait_until(lambda: ctx.dolphin_status == CONNECTION_CONNECTED_STATUS, 5)
+        send_latencies = []
+        round_trips = []
+        for _ in range(samples):
+            # Respawn and let the client see that the player is alive again.
+            fake.set_health(0x18)
+            await wait_until(lambda: not ctx.has_send_death, 5)
+            ctx.last_death_link = 0
+            deaths = len(server.received)
+
+            start = time.perf_counter()
+            fake.set_health(0)
+            if not await wait_until(
+                lambda: any("DeathLink" in msg.get("tags", ()) for _, msg in server.received[deaths:]), 5
+            ):
+                continue
+            received = next(
+                received for received, msg in server.received[deaths:] if "DeathLink" in msg.get("tags", ())
+            )
+            send_latencies.append((received - start) * 1000)
+
+            # Another player receives the death, dies too, and their death is bounced back.
+            fake.set_health(0x18)
+            ctx.on_deathlink({"time": time.time(), "source": "Other", "cause": ""})
+            if await wait_until(dead, 5):
+                round_trips.append((time.perf_counter() - start) * 1000)
+        return {
+            "benchmark": "deathlink",
+            "samples": len(round_trips),
+            "send_p50_ms": percentile(send_latencies, 50),
+            "send_p95_ms": percentile(send_latencies, 95),
+            "round_trip_p50_ms": percentile(round_trips, 50),
+            "round_trip_p95_ms": percentile(round_trips, 95),
+        }
+
+    return await run_client(fake, ctx, 1.0, bench)
+
+
+async def run_benchmarks(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """
+    Run the selected benchmarks.
+
+    :param args: The parsed command line arguments.
+    :return: The result of each benchmark.
+    """
+    all_locations = sum(code is not None for code in LOCATION_FLAG_CHECKS.id_to_flags)
+    benchmarks: list[tuple[str, Callable[[], Awaitable[dict[str, Any]]]]] = []
+    for checked in (0, 10, all_locations):
+        benchmarks.append(("check_locations", lambda checked=checked: bench_check_locations(checked, args.duration)))
+    for count in (50, 200, 1000):
+        benchmarks.append(
+            ("drain_items", lambda count=count: bench_drain_items(count, args.slots, args.speed, args.timeout))
+        )
+    benchmarks.append(("check_latency", lambda: bench_check_latency(args.samples, args.interval)))
+    benchmarks.append(("deathlink", lambda: bench_deathlink(args.samples)))
+
+    results = []
+    for name, bench in benchmarks:
+        if args.only and name not in args.only:
+            continue
+        result = await bench()
+        result["time"] = time.time()
+        results.append(result)
+        line = json.dumps(result)
+        print(line, flush=True)
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as output:
+                output.write(line + "\n")
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Benchmark the SS client against a fake Dolphin and a stand-in server.
+    From the Archipelago directory, run `python -m worlds.ss.Client.Benchmark`.
+    Each result is printed as one JSON object per line.
+
+    :param argv: Command line arguments. Defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Skyward Sword client.")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=["check_locations", "drain_items", "check_latency", "deathlink"],
+        help="Only run these benchmarks.",
+    )
+    parser.add_argument("--output", help="Also append the results to this JSON lines file.")
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds to time each location check case.")
+    parser.add_argument("--slots", type=int, default=GIVE_ITEM_ARRAY_LENGTH, help="Slots in the give item array.")
+    parser.add_argument("--speed", type=float, default=10.0, help="Game speed while draining items.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for a backlog to drain.")
+    parser.add_argument("--samples", type=int, default=20, help="Samples for the latency benchmarks.")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between location check samples.")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    asyncio.run(run_benchmarks(args))
+    SSClient.dme_worker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from ..Constants import *
+
+
+class SSFakeDolphin:
+    """
+    An in-process stand-in for dolphin_memory_engine, backed by an image of MEM1.
+
+    Nothing runs on its own: the game is simulated one frame at a time by `advance`, or in real time by `run`. Each
+    frame, scripted events that are due are applied, then the game takes one item out of the give item array the way
+    the patched game does. This lets the client's sync loop, item delivery and location checks be run and timed
+    without an emulator. Use `SSClient.use_memory_backend` to make the client use it.
+    """
+
+    MEM1_START = 0x80000000
+    MEM1_SIZE = 0x1800000
+    FRAME_RATE = 60
+
+    def __init__(self, image: Optional[bytes] = None):
+        """
+        Create a fake Dolphin.
+
+        :param image: Image of MEM1 to start from. Defaults to a game that is loaded into File 1 (see `load_game`).
+        """
+        self.ram = bytearray(self.MEM1_SIZE)
+        self.hooked: bool = False
+        self.frame: int = 0
+        # Frame -> events to apply at the start of that frame.
+        self.events: dict[int, list[Callable[[], Any]]] = {}
+        # In-game item IDs taken out of the give item array, in order.
+        self.items_given: list[int] = []
+        # Number of frames Link stays in the item get action after taking an item.
+        self.item_get_frames: int = 30
+        self.item_get_frames_left: int = 0
+        # Number of slots of the give item array the game takes items from.
+        self.give_item_array_length: int = GIVE_ITEM_ARRAY_LENGTH
+        # Whether the game takes items out of the give item array at all.
+        self.consume_items: bool = True
+
+        if image is None:
+            self.load_game()
+        else:
+            self.ram[: len(image)] = image
+
+    # dolphin_memory_engine API
+
+    def hook(self) -> None:
+        """
+        Hook into the fake Dolphin. Always succeeds.
+        """
+        self.hooked = True
+
+    def un_hook(self) -> None:
+        """
+        Unhook from the fake Dolphin.
+        """
+        self.hooked = False
+
+    def is_hooked(self) -> bool:
+        """
+        :return: `True` if hooked, otherwise `False`.
+        """
+        return self.hooked
+
+    def read_bytes(self, console_address: int, size: int) -> bytes:
+        """
+        Read bytes from memory.
+
+        :param console_address: Address to start reading from.
+        :param size: Number of bytes to read.
+        :return: The bytes read.
+        """
+        offset = self._offset(console_address, size)
+        return bytes(self.ram[offset : offset + size])
+
+    def read_byte(self, console_address: int) -> int:
+        """
+        Read 1 byte from memory.
+
+        :param console_address: Address to read from.
+        :return: The value read.
+        """
+        return self.ram[self._offset(console_address, 1)]
+
+    def read_word(self, console_address: int) -> int:
+        """
+        Read a 4-byte word from memory.
+
+        :param console_address: Address to read from.
+        :return: The value read.
+        """
+        return int.from_bytes(self.read_bytes(console_address, 4), "big")
+
+    def write_byte(self, console_address: int, value: int) -> None:
+        """
+        Write 1 byte to memory.
+
+        :param console_address: Address to write to.
+        :param value: Value to write.
+        """
+        self.ram[self._offset(console_address, 1)] = value
+
+    def write_bytes(self, console_address: int, data: bytes) -> None:
+        """
+        Write bytes to memory.
+
+        :param console_address: Address to start writing at.
+        :param data: Bytes to write.
+        """
+        offset = self._offset(console_address, len(data))
+        self.ram[offset : offset + len(data)] = data
+
+    def _offset(self, console_address: int, size: int) -> int:
+        """
+        Get the offset of an address in the RAM image, failing like dolphin_memory_engine does.
+
+        :param console_address: Address in MEM1.
+        :param size: Number of bytes that will be accessed.
+        :return: The offset.
+        """
+        if not self.hooked:
+            raise RuntimeError("Dolphin is not hooked.")
+        offset = console_address - self.MEM1_START
+        if offset < 0 or offset + size > self.MEM1_SIZE:
+            raise RuntimeError(f"Could not access {size} byte(s) at {console_address:#x}.")
+        return offset
+
+    # Game state
+
+    def poke(self, console_address: int, data: bytes) -> None:
+        """
+        Write to the RAM image directly, whether hooked or not.
+
+        :param console_address: Address to start writing at.
+        :param data: Bytes to write.
+        """
+        offset = console_address - self.MEM1_START
+        self.ram[offset : offset + len(data)] = data
+
+    def peek(self, console_address: int, size: int) -> bytes:
+        """
+        Read from the RAM image directly, whether hooked or not.
+
+        :param console_address: Address to start reading from.
+        :param size: Number of bytes to read.
+        :return: The bytes read.
+        """
+        offset = console_address - self.MEM1_START
+        return bytes(self.ram[offset : offset + size])
+
+    def load_game(self, stage: str = "F000") -> None:
+        """
+        Put the game in a state where Link is standing in a stage on File 1 and can receive items.
+
+        :param stage: Name of the stage.
+        """
+        self.poke(self.MEM1_START, b"SOUE01")
+        self.poke(CURR_STATE_ADDR, b"\x01\x02\x03")
+        self.poke(LINK_ACTION_ADDR, b"\x00")
+        self.poke(MINIGAME_STATE_ADDR, b"\x01")
+        self.poke(SELECTED_FILE_ADDR, b"\x00")
+        self.poke(GLOBAL_TITLE_LOADER_ADDR, b"\x00")
+        self.poke(ARCHIPELAGO_ARRAY_ADDR, b"\xFF" * 0x10)
+        self.set_health(0x18)
+        self.set_stage(stage)
+
+    def set_flag(self, console_address: int, mask: int) -> None:
+        """
+        Set flag bits.
+
+        :param console_address: Address of the flag's byte.
+        :param mask: Bits to set.
+        """
+        self.poke(console_address, bytes([self.peek(console_address, 1)[0] | mask]))
+
+    def set_stage(self, stage: str) -> None:
+        """
+        Move Link to a stage.
+
+        :param stage: Name of the stage.
+        """
+        self.poke(CURR_STAGE_ADDR, stage.encode().ljust(16, b"\0"))
+
+    def set_health(self, health: int) -> None:
+        """
+        Set Link's health. Zero kills him.
+
+        :param health: Health in quarter hearts.
+        """
+        self.poke(CURR_HEALTH_ADDR, health.to_bytes(2, "big"))
+
+    def set_slot_name(self, name: str) -> None:
+        """
+        Set the slot name the patched game stores after the give item array.
+
+        :param name: The slot name.
+        """
+        self.poke(ARCHIPELAGO_ARRAY_ADDR + 0x14, name.encode().ljust(0x10, b"\xFF"))
+
+    # Simulation
+
+    def at(self, frame: int, event: Callable[[], Any]) -> None:
+        """
+        Schedule an event, e.g. `fake.at(120, lambda: fake.set_health(0))`.
+
+        :param frame: Frame to apply the event at. Frames in the past apply on the next frame.
+        :param event: Function that changes the game's state.
+        """
+        self.events.setdefault(max(frame, self.frame + 1), []).append(event)
+
+    def advance(self, frames: int = 1) -> None:
+        """
+        Simulate frames of the game.
+
+        :param frames: Number of frames to simulate.
+        """
+        for _ in range(frames):
+            self.frame += 1
+            for event in self.events.pop(self.frame, []):
+                event()
+            self._take_item()
+
+    def _take_item(self) -> None:
+        """
+        Take the first item out of the give item array and put Link in the item get action for a while.
+        """
+        if self.item_get_frames_left:
+            self.item_get_frames_left -= 1
+            if not self.item_get_frames_left:
+                self.poke(LINK_ACTION_ADDR, b"\x00")
+        if not self.consume_items:
+            return
+        give_item_array = self.peek(ARCHIPELAGO_ARRAY_ADDR, self.give_item_array_length)
+        for slot, item_id in enumerate(give_item_array):
+            if item_id != 0xFF:
+                self.items_given.append(item_id)
+                self.poke(ARCHIPELAGO_ARRAY_ADDR + slot, b"\xFF")
+                self.poke(LINK_ACTION_ADDR, bytes([ITEM_GET_ACTION]))
+                self.item_get_frames_left = self.item_get_frames
+                break
+
+    async def run(self, speed: float = 1.0) -> None:
+        """
+        Simulate the game in real time until cancelled.
+
+        :param speed: How many times faster than real time to run.
+        """
+        while True:
+            await asyncio.sleep(1 / (self.FRAME_RATE * speed))
+            self.advance()
@@ -0,0 +1,133 @@
+from typing import Any, Iterable, Optional
+
+from ..Locations import LOCATION_TABLE, SSLocation
+
+# Key of the tracker feed in the data of the client's Bounce messages.
+TRACKER_FEED_KEY = "ss_tracker"
+# A tracker that missed an update bounces `{TRACKER_FEED_RESYNC_KEY: true}` to the slot to get a full update.
+TRACKER_FEED_RESYNC_KEY = "ss_tracker_resync"
+
+# Number of bytes in the checked location bitset, with one bit per location code.
+LOCATION_BITSET_SIZE = max(data.code for data in LOCATION_TABLE.values() if data.code is not None) // 8 + 1
+
+
+def diff_runs(old: bytes, new: bytes, max_gap: int = 4) -> list[tuple[int, bytes]]:
+    """
+    Find the runs of bytes that differ between two snapshots of the same size.
+
+    :param old: The previous snapshot.
+    :param new: The current snapshot.
+    :param max_gap: Changed bytes that are at most this many bytes apart are part of the same run.
+    :return: (offset, new bytes) of each run.
+    """
+    runs = []
+    start = end = None
+    for offset in range(len(new)):
+        if old[offset] != new[offset]:
+            if start is None or offset - end > max_gap:
+                if start is not None:
+                    runs.append((start, new[start:end]))
+                start = offset
+            end = offset + 1
+    if start is not None:
+        runs.append((start, new[start:end]))
+    return runs
+
+
+def location_bitset(apids: Iterable[int]) -> bytes:
+    """
+    :param apids: AP IDs of locations.
+    :return: Bitset of the locations, where bit `code % 8` of byte `code // 8` is set for each location code.
+    """
+    bitset = bytearray(LOCATION_BITSET_SIZE)
+    base = SSLocation.get_apid(0)
+    for apid in apids:
+        code = apid - base
+        if 0 <= code < LOCATION_BITSET_SIZE * 8:
+            bitset[code // 8] |= 1 << (code % 8)
+    return bytes(bitset)
+
+
+class SSTrackerFeed:
+    """
+    Publishes the player's progress to trackers over Bounce, so they don't have to poll the server's data storage.
+
+    Each update is the data of one Bounce message to the slot, under `TRACKER_FEED_KEY`:
+    - `seq`: Sequence number of the update, counting from 0 after each full update.
+    - `full`: `True` if the update is relative to an empty state (all zero bytes, no items) instead of the last update.
+    - `flags`: (offset, hex bytes) of each changed run of the flag snapshot (storyflags followed by sceneflags).
+    - `checked`: (offset, hex bytes) of each changed run of the checked location bitset (see `location_bitset`).
+    - `inventory`: Item name -> new count of each item whose count changed.
+    - `stage`: Name of the current stage, if it changed.
+    Keys that didn't change are left out. A tracker that sees a gap in `seq` asks for a full update.
+    """
+
+    def __init__(self):
+        """
+        Create a feed whose first update is a full update.
+        """
+        self.seq: int = 0
+        self.full_pending: bool = True
+        # State as of the last update sent.
+        self.flags: bytes = b""
+        self.checked: bytes = bytes(LOCATION_BITSET_SIZE)
+        self.inventory: dict[str, int] = {}
+        self.stage: Optional[str] = None
+        # Number of updates sent, for the /perf command.
+        self.updates_sent: int = 0
+
+    def request_resync(self) -> None:
+        """
+        Make the next update a full update.
+        """
+        self.full_pending = True
+
+    def update(
+        self,
+        flags: Optional[bytes],
+        checked: bytes,
+        inventory: dict[str, int],
+        stage: Optional[str],
+    ) -> Optional[dict[str, Any]]:
+        """
+        Make an update from the current state, relative to the last update sent.
+
+        :param flags: The flag snapshot, or `None` if it hasn't been read.
+        :param checked: The checked location bitset.
+        :param inventory: Item name -> number collected.
+        :param stage: Name of the current stage.
+        :return: The update, or `None` if nothing changed.
+        """
+        if flags is None:
+            flags = self.flags
+        # Flags can't be diffed against a snapshot of another size, e.g. before the first one was read.
+        full = self.full_pending or len(flags) != len(self.flags)
+        old_flags = bytes(len(flags)) if full else self.flags
+        old_checked = bytes(LOCATION_BITSET_SIZE) if full else self.checked
+        old_inventory = {} if full else self.inventory
+
+        update: dict[str, Any] = {}
+        flag_runs = diff_runs(old_flags, flags)
+        if flag_runs:
+            update["flags"] = [[offset, data.hex()] for offset, data in flag_runs]
+        checked_runs = diff_runs(old_checked, checked)
+        if checked_runs:
+            update["checked"] = [[offset, data.hex()] for offset, data in checked_runs]
+        changed_items = {
+            item: count for item, count in inventory.items() if count and old_inventory.get(item, 0) != count
+        }
+        if changed_items:
+            update["inventory"] = changed_items
+        if stage != self.stage or (full and stage):
+            update["stage"] = stage
+        if not update and not full:
+            return None
+
+        self.seq = 0 if full else self.seq + 1
+        self.full_pending = False
+        self.flags = flags
+        self.checked = checked
+        self.inventory = dict(inventory)
+        self.stage = stage
+        self.updates_sent += 1
+        return {"seq": self.seq, "full": full, **update}
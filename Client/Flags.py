@@ -0,0 +1,194 @@
+from typing import Any, Hashable, Iterable, Optional
+
+from ..Constants import *
+from ..Hints import HINT_TABLE
+from ..Locations import LOCATION_TABLE, SSLocCheckedFlag
+
+def get_flag_offset(flag_type: SSLocCheckedFlag, flag_bit: int, addr: Any) -> int:
+    """
+    Get the offset of a flag's byte in the flag snapshot.
+    The snapshot is the storyflag block followed by the sceneflag block.
+
+    :param flag_type: Whether the flag is a storyflag or a sceneflag.
+    :param flag_bit: Byte index (0x0-0xF) of the flag from the flag address.
+    :param addr: Storyflag address (ending in zero) OR scene name for sceneflags.
+    :return: The offset of the flag's byte in the snapshot.
+    """
+    if flag_type == SSLocCheckedFlag.STORY:
+        return addr + flag_bit - STORYFLAG_BLOCK_ADDR
+    return (
+        STORYFLAG_BLOCK_SIZE
+        + STAGE_TO_SCENEFLAG_ADDR[addr]
+        + flag_bit
+        - SCENEFLAG_BLOCK_ADDR
+    )
+
+
+class SSFlagChecks:
+    """
+    Flag checks compiled into bit masks over the flag snapshot, indexed by bit, by byte and by id.
+
+    The whole table is evaluated at once by treating the flag snapshot as one little-endian integer, so the snapshot
+    byte at offset `n` holds bits `8n` through `8n + 7`. An [ANY] entry is checked if any of its flags is set, an
+    [ALL] entry only if all of its flags are set.
+    """
+
+    def __init__(self, checks: Iterable[tuple[Hashable, SSLocCheckedFlag, list[tuple[int, int]]]]):
+        """
+        Compile the flag checks.
+
+        :param checks: The id of each entry, whether [ANY] or [ALL] of its flags must be set, and its flags as
+            (snapshot offset, mask) pairs.
+        """
+        # Mask of every bit in the snapshot that checks at least one entry.
+        self.mask: int = 0
+        # Bit position in the snapshot -> ids checked by that bit.
+        self.bit_to_ids: dict[int, tuple[Hashable, ...]] = {}
+        # Reverse index of snapshot offset -> ids that depend on the byte at that offset.
+        self.byte_to_ids: dict[int, tuple[Hashable, ...]] = {}
+        # Id -> the (snapshot offset, mask) flags that check it.
+        self.id_to_flags: dict[Hashable, tuple[tuple[int, int], ...]] = {}
+        # Id -> mask of all bits in the snapshot that check it.
+        self.id_to_mask: dict[Hashable, int] = {}
+        # Ids that need all of their flags set.
+        self.all_of: set[Hashable] = set()
+
+        for check_id, predicate, flags in checks:
+            if predicate == SSLocCheckedFlag.ALL:
+                self.all_of.add(check_id)
+            for offset, mask in flags:
+                self.id_to_flags[check_id] = self.id_to_flags.get(check_id, ()) + ((offset, mask),)
+                if check_id not in self.byte_to_ids.get(offset, ()):
+                    self.byte_to_ids[offset] = self.byte_to_ids.get(offset, ()) + (check_id,)
+                for bit in range(8):
+                    if mask & (1 << bit):
+                        pos = offset * 8 + bit
+                        self.mask |= 1 << pos
+                        self.id_to_mask[check_id] = self.id_to_mask.get(check_id, 0) | (1 << pos)
+                        self.bit_to_ids[pos] = self.bit_to_ids.get(pos, ()) + (check_id,)
+
+    def mask_of(self, check_ids: Iterable[Hashable]) -> int:
+        """
+        Get the mask of all bits in the snapshot that check any of the given entries.
+
+        :param check_ids: The ids of the entries.
+        :return: The combined mask.
+        """
+        mask = 0
+        for check_id in check_ids:
+            mask |= self.id_to_mask.get(check_id, 0)
+        return mask
+
+    def checked(self, snapshot: bytes, mask: Optional[int] = None) -> set[Hashable]:
+        """
+        Find all entries whose flags are set in a flag snapshot.
+
+        :param snapshot: The flag snapshot.
+        :param mask: Only evaluate the entries in this mask (see `mask_of`). Defaults to the whole table.
+        :return: The set of checked ids.
+        """
+        if mask is None:
+            mask = self.mask
+        hits = int.from_bytes(snapshot, "little") & mask
+        checked = set()
+        while hits:
+            low = hits & -hits
+            checked.update(self.bit_to_ids[low.bit_length() - 1])
+            hits ^= low
+        if mask != self.mask:
+            checked = {check_id for check_id in checked if self.id_to_mask[check_id] & mask}
+        if self.all_of:
+            checked = {
+                check_id
+                for check_id in checked
+                if check_id not in self.all_of or self.is_checked(check_id, snapshot)
+            }
+        return checked
+
+    def changed(self, old_snapshot: bytes, new_snapshot: bytes, mask: Optional[int] = None) -> set[Hashable]:
+        """
+        Find all entries that depend on a byte that differs between two flag snapshots.
+
+        :param old_snapshot: The previous flag snapshot.
+        :param new_snapshot: The current flag snapshot.
+        :param mask: Only consider the entries in this mask (see `mask_of`). Defaults to the whole table.
+        :return: The set of ids whose flags may have changed.
+        """
+        if mask is None:
+            mask = self.mask
+        if old_snapshot == new_snapshot or not mask:
+            return set()
+        diff = (
+            int.from_bytes(old_snapshot, "little") ^ int.from_bytes(new_snapshot, "little")
+        ) & mask
+        changed = set()
+        while diff:
+            offset = ((diff & -diff).bit_length() - 1) >> 3
+            changed.update(self.byte_to_ids[offset])
+            # Skip the rest of this byte.
+            diff &= ~(0xFF << (offset * 8))
+        if mask != self.mask:
+            changed = {check_id for check_id in changed if self.id_to_mask[check_id] & mask}
+        return changed
+
+    def is_checked(self, check_id: Hashable, snapshot: bytes) -> bool:
+        """
+        Check whether a single entry's flags are set in a flag snapshot.
+
+        :param check_id: The id of the entry.
+        :param snapshot: The flag snapshot.
+        :return: `True` if the entry's flags are set, otherwise `False`.
+        """
+        if check_id in self.all_of:
+            return all(snapshot[offset] & mask for offset, mask in self.id_to_flags[check_id])
+        return any(snapshot[offset] & mask for offset, mask in self.id_to_flags[check_id])
+
+    def checked_since(
+        self, old_snapshot: Optional[bytes], new_snapshot: bytes, mask: Optional[int] = None
+    ) -> set[Hashable]:
+        """
+        Find all entries that are checked in the new snapshot, re-evaluating only the entries whose bytes changed.
+        If there is no previous snapshot, the whole table is evaluated.
+
+        :param old_snapshot: The previous flag snapshot, or `None`.
+        :param new_snapshot: The current flag snapshot.
+        :param mask: Only evaluate the entries in this mask (see `mask_of`). Defaults to the whole table.
+        :return: The set of checked ids among the re-evaluated entries.
+        """
+        if old_snapshot is None:
+            return self.checked(new_snapshot, mask)
+        return {
+            check_id
+            for check_id in self.changed(old_snapshot, new_snapshot, mask)
+            if self.is_checked(check_id, new_snapshot)
+        }
+
+
+def compile_checked_flag(checked_flag: list) -> tuple[SSLocCheckedFlag, list[tuple[int, int]]]:
+    """
+    Compile a location's checked flag into snapshot offsets and masks.
+
+    :param checked_flag: The `checked_flag` of a location in the location table.
+    :return: Whether [ANY] or [ALL] of the flags must be set, and the flags as (snapshot offset, mask) pairs.
+    """
+    if checked_flag[0] in (SSLocCheckedFlag.ANY, SSLocCheckedFlag.ALL):
+        [predicate, flags] = checked_flag
+        return predicate, [
+            (get_flag_offset(flag_type, flag_bit, addr), flag_value)
+            for [flag_type, flag_bit, flag_value, addr] in flags
+        ]
+    [flag_type, flag_bit, flag_value, addr] = checked_flag
+    return SSLocCheckedFlag.ANY, [(get_flag_offset(flag_type, flag_bit, addr), flag_value)]
+
+
+# Checked ids are location codes (`None` for Defeat Demise).
+LOCATION_FLAG_CHECKS = SSFlagChecks(
+    (data.code, *compile_checked_flag(data.checked_flag))
+    for data in LOCATION_TABLE.values()
+)
+
+# Checked ids are hint names. All hint flags are storyflags.
+HINT_FLAG_CHECKS = SSFlagChecks(
+    (hint, *compile_checked_flag([SSLocCheckedFlag.STORY, *data.checked_flag]))
+    for hint, data in HINT_TABLE.items()
+)
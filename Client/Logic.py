@@ -0,0 +1,235 @@
+from collections import Counter
+from dataclasses import fields
+from types import SimpleNamespace
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from .. import Macros
+from ..Constants import *
+from ..Locations import LOCATION_TABLE
+from ..Options import SSOptions
+from ..Rules import SSLogic, set_rules
+
+# A dependency of a rule: ("item", name), ("region", name) or ("location", name).
+Dependency = tuple[str, str]
+# A rule: ("exit", (source region, target region)) or ("location", name).
+RuleKey = tuple[str, Hashable]
+
+
+class SSLogicTracker:
+    """
+    Tracks which locations are in logic for one slot as items are collected, using the world's own rules and macros.
+
+    The tracker stands in for the `CollectionState` that the rules are written against. While a rule is evaluated, each
+    item, region and location it asks about is recorded as a dependency of that rule. Rules that aren't met yet are
+    indexed by those dependencies, and collecting an item only re-evaluates the rules that read it, along with whatever
+    depends on the regions and locations that come into logic as a result. Logic only ever grows as items are
+    collected, so rules that are met are never evaluated again.
+    """
+
+    def __init__(self, player: int, slot_data: dict[str, Any]):
+        """
+        Build the region graph and the location rules from the slot data, and find what is in logic with no items.
+
+        :param player: The slot the slot data belongs to.
+        :param slot_data: The slot data from the `Connected` packet.
+        :raises KeyError: If the slot data is from a version of the world that doesn't support the logic tracker.
+        """
+        self.player = player
+        world = SimpleNamespace(
+            player=player,
+            options=SimpleNamespace(
+                **{
+                    field.name: field.type.from_any(slot_data[field.name])
+                    for field in fields(SSOptions)
+                    if field.name in slot_data
+                }
+            ),
+            dungeons=SimpleNamespace(
+                required_dungeon_checks=[DUNGEON_FINAL_CHECKS[dun] for dun in slot_data["required_dungeons"]]
+            ),
+        )
+        # The `_ss_` logic methods read the options through the multiworld.
+        self.multiworld = SimpleNamespace(worlds={player: world})
+
+        # Item name -> number collected.
+        self.items: Counter[str] = Counter()
+        self.reachable_regions: set[str] = set()
+        self.in_logic: set[str] = set()
+
+        # Region -> connected region -> rule for going there.
+        self.exits: dict[str, dict[str, Callable[["SSLogicTracker"], bool]]] = {}
+        self._build_regions(slot_data["dungeon_connections"], slot_data["trial_connections"])
+        self.location_rules: dict[str, Callable[["SSLogicTracker"], bool]] = self._build_location_rules(world)
+        self.locations_in_region: dict[str, list[str]] = {}
+        for name, data in LOCATION_TABLE.items():
+            self.locations_in_region.setdefault(data.region, []).append(name)
+
+        # Dependency -> rules that aren't met and read it the last time they were evaluated.
+        self.dependents: dict[Dependency, set[RuleKey]] = {}
+        # Rule -> dependencies it read the last time it was evaluated.
+        self.rule_reads: dict[RuleKey, set[Dependency]] = {}
+        # Dependencies read by the rule being evaluated.
+        self._reads: Optional[set[Dependency]] = None
+
+        # Number of rules evaluated so far, to see how much work each update does.
+        self.evaluations: int = 0
+
+        self.reachable_regions.add(ORIGIN_REGION)
+        self._propagate(self._rules_in_region(ORIGIN_REGION))
+
+    def _build_regions(self, dungeon_connections: dict[str, str], trial_connections: dict[str, str]) -> None:
+        """
+        Connect the regions the same way `SSWorld.create_regions` does.
+
+        :param dungeon_connections: Dungeon -> dungeon entrance it is behind.
+        :param trial_connections: Silent realm -> trial gate it is behind.
+        """
+        player = self.player
+
+        def connect(source: str, target: str, rule: Callable[["SSLogicTracker"], bool]) -> None:
+            self.exits.setdefault(source, {})[target] = rule
+
+        for reg, conn in OVERWORLD_REGIONS.items():
+            for conn_reg in conn:
+                formatted_region = conn_reg.lower().replace("'", "").replace(" ", "_")
+                access_rule = getattr(Macros, f"can_access_{formatted_region}")
+                connect(reg, conn_reg, lambda state, rule=access_rule: rule(state, player))
+        for dun, conn in dungeon_connections.items():
+            connect(dun, DUNGEON_ENTRANCE_REGIONS[conn], lambda state: True)
+            entrance_rule = getattr(Macros, f"can_reach_{conn}")
+            connect(DUNGEON_ENTRANCE_REGIONS[conn], dun, lambda state, rule=entrance_rule: rule(state, player))
+        for trl, conn in trial_connections.items():
+            connect(trl, TRIAL_GATE_REGIONS[conn], lambda state: True)
+            gate_rule = getattr(Macros, f"can_open_{conn}")
+            connect(TRIAL_GATE_REGIONS[conn], trl, lambda state, rule=gate_rule: rule(state, player))
+
+    @staticmethod
+    def _build_location_rules(world: SimpleNamespace) -> dict[str, Callable[["SSLogicTracker"], bool]]:
+        """
+        Collect the rule of every location from `set_rules`, as if every location were a progress location.
+
+        :param world: Stand-in for the world that `set_rules` reads the player from.
+        :return: Location name -> rule. Locations without a rule are always in logic once their region is reachable.
+        """
+        locations = {name: SimpleNamespace(access_rule=lambda state: True) for name in LOCATION_TABLE}
+        world.progress_locations = set(LOCATION_TABLE)
+        world.get_location = locations.__getitem__
+        set_rules(world)
+        return {name: location.access_rule for name, location in locations.items()}
+
+    # CollectionState API used by the rules and macros
+
+    def has(self, item: str, player: int, count: int = 1) -> bool:
+        """
+        :param item: Name of the item.
+        :param player: The slot. Only the tracked slot's items are known.
+        :param count: How many of the item are needed.
+        :return: `True` if at least `count` of the item have been collected, otherwise `False`.
+        """
+        if self._reads is not None:
+            self._reads.add(("item", item))
+        return self.items[item] >= count
+
+    def can_reach_region(self, region: str, player: int) -> bool:
+        """
+        :param region: Name of the region.
+        :param player: The slot.
+        :return: `True` if the region is reachable, otherwise `False`.
+        """
+        if self._reads is not None:
+            self._reads.add(("region", region))
+        return region in self.reachable_regions
+
+    def can_reach_location(self, location: str, player: int) -> bool:
+        """
+        :param location: Name of the location.
+        :param player: The slot.
+        :return: `True` if the location is in logic, otherwise `False`.
+        """
+        if self._reads is not None:
+            self._reads.add(("location", location))
+        return location in self.in_logic
+
+    # Incremental updates
+
+    def collect(self, items: Iterable[str]) -> set[str]:
+        """
+        Collect items and re-evaluate the rules that depend on them.
+
+        :param items: Names of the items, one entry per copy.
+        :return: Names of the locations that came into logic.
+        """
+        collected = Counter(items)
+        if not collected:
+            return set()
+        self.items.update(collected)
+        changed = set()
+        for item in collected:
+            changed |= self.dependents.pop(("item", item), set())
+        return self._propagate(changed)
+
+    def _rules_in_region(self, region: str) -> set[RuleKey]:
+        """
+        :param region: A region that just became reachable.
+        :return: The rules of the region's exits to unreachable regions and of its locations.
+        """
+        rules: set[RuleKey] = {
+            ("exit", (region, target))
+            for target in self.exits.get(region, {})
+            if target not in self.reachable_regions
+        }
+        rules.update(("location", name) for name in self.locations_in_region.get(region, []))
+        return rules
+
+    def _propagate(self, rules: set[RuleKey]) -> set[str]:
+        """
+        Evaluate rules until nothing else comes into logic.
+
+        :param rules: Rules whose dependencies changed.
+        :return: Names of the locations that came into logic.
+        """
+        new_locations = set()
+        while rules:
+            kind, key = rule = rules.pop()
+            if kind == "exit":
+                source, target = key
+                if target in self.reachable_regions or not self._evaluate(rule, self.exits[source][target]):
+                    continue
+                self.reachable_regions.add(target)
+                rules |= self._rules_in_region(target)
+                rules |= self.dependents.pop(("region", target), set())
+            else:
+                if key in self.in_logic or not self._evaluate(rule, self.location_rules[key]):
+                    continue
+                self.in_logic.add(key)
+                new_locations.add(key)
+                rules |= self.dependents.pop(("location", key), set())
+        return new_locations
+
+    def _evaluate(self, rule: RuleKey, access_rule: Callable[["SSLogicTracker"], bool]) -> bool:
+        """
+        Evaluate a rule, and index it by what it read if it isn't met.
+
+        :param rule: The rule.
+        :param access_rule: The function that evaluates it.
+        :return: `True` if the rule is met, otherwise `False`.
+        """
+        for dependency in self.rule_reads.pop(rule, ()):
+            self.dependents.get(dependency, set()).discard(rule)
+        self._reads = reads = set()
+        try:
+            met = access_rule(self)
+        finally:
+            self._reads = None
+        self.evaluations += 1
+        if not met:
+            self.rule_reads[rule] = reads
+            for dependency in reads:
+                self.dependents.setdefault(dependency, set()).add(rule)
+        return met
+
+
+# Reuse the world's logic methods, which only need `multiworld` and `can_reach_location` from the state.
+for _name, _method in vars(SSLogic).items():
+    if _name.startswith("_ss_"):
+        setattr(SSLogicTracker, _name, _method)
@@ -0,0 +1,333 @@
+import asyncio
+import glob
+import mmap
+import os
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SSReadCache:
+    """
+    Caches reads from Dolphin memory for the duration of one tick of the sync loop.
+
+    Reads of the same addresses within a tick are only sent to Dolphin once. A read that lies within a range that was
+    already read is served from that range. The cache must be invalidated when the tick ends and whenever memory is
+    written.
+    """
+
+    def __init__(self, read_bytes: Callable[[int, int], bytes]):
+        """
+        Create a read cache.
+
+        :param read_bytes: Function that reads a number of bytes from Dolphin memory at an address.
+        """
+        self._read_bytes = read_bytes
+        # Start address -> bytes read from that address during this tick.
+        self.ranges: dict[int, bytes] = {}
+        # Field name -> value decoded from the ranges read ahead of time this tick (see `SSReadPlan.decode`).
+        self.fields: dict[str, Any] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def read_bytes(self, console_address: int, size: int) -> bytes:
+        """
+        Read bytes from Dolphin memory, or from the cache if they were already read this tick.
+
+        :param console_address: Address to start reading from.
+        :param size: Number of bytes to read.
+        :return: The bytes read.
+        """
+        data = self.ranges.get(console_address)
+        if data is not None and len(data) >= size:
+            self.hits += 1
+            return data[:size]
+        for start, data in self.ranges.items():
+            if start <= console_address and console_address + size <= start + len(data):
+                self.hits += 1
+                return data[console_address - start : console_address - start + size]
+        self.misses += 1
+        data = self._read_bytes(console_address, size)
+        self.ranges[console_address] = data
+        return data
+
+    def store(self, ranges: dict[int, bytes], fields: Optional[dict[str, Any]] = None) -> None:
+        """
+        Add ranges that were read ahead of time, e.g. by `SSMemoryWorker.read_ranges`.
+
+        :param ranges: Start address -> bytes read from that address.
+        :param fields: Field name -> value of each field decoded from the ranges.
+        """
+        self.ranges.update(ranges)
+        if fields is not None:
+            self.fields.update(fields)
+
+    def invalidate(self) -> None:
+        """
+        Forget everything read so far. Call this when a tick ends or memory is written.
+        """
+        self.ranges.clear()
+        self.fields.clear()
+
+
+class SSMemoryWorker:
+    """
+    Runs every call into Dolphin's memory on one dedicated thread.
+
+    Hooking Dolphin and reading its memory can take a while, and would otherwise block the event loop that also runs
+    the server connection and the GUI. Coroutines await calls through `run`, or batch all of a tick's reads into one
+    call with `read_ranges`. Writes are queued with `submit` without waiting, since the one thread runs them in order
+    before any later read. Reads from synchronous code that weren't read ahead go through `call`, which still waits.
+    """
+
+    def __init__(self):
+        """
+        Create the worker. Its thread is started on the first call.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DolphinMemory")
+        # Reads run on the worker thread through `read_bytes` and `read_ranges`, and the bytes they read.
+        self.reads: int = 0
+        self.bytes_read: int = 0
+
+    def submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Queue a call on the worker thread.
+
+        :param func: Function to call.
+        :param args: Arguments for the function.
+        :return: Future for the function's result.
+        """
+        return self.executor.submit(func, *args)
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call a function on the worker thread and wait for its result.
+
+        :param func: Function to call.
+        :param args: Arguments for the function.
+        :return: The function's result.
+        """
+        return self.submit(func, *args).result()
+
+    def read_bytes(self, read_bytes: Callable[[int, int], bytes], console_address: int, size: int) -> bytes:
+        """
+        Read bytes on the worker thread and wait for them.
+
+        :param read_bytes: Function that reads a number of bytes from Dolphin memory at an address.
+        :param console_address: Address to start reading from.
+        :param size: Number of bytes to read.
+        :return: The bytes read.
+        """
+        self.reads += 1
+        self.bytes_read += size
+        return self.call(read_bytes, console_address, size)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call a function on the worker thread without blocking the event loop.
+
+        :param func: Function to call.
+        :param args: Arguments for the function.
+        :return: The function's result.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    async def read_ranges(
+        self, read_bytes: Callable[[int, int], bytes], ranges: Iterable[tuple[int, int]]
+    ) -> dict[int, bytes]:
+        """
+        Read several ranges of memory in one call on the worker thread.
+
+        :param read_bytes: Function that reads a number of bytes from Dolphin memory at an address.
+        :param ranges: The (address, size) ranges to read.
+        :return: Start address -> bytes read from that address.
+        """
+        ranges = list(ranges)
+        self.reads += len(ranges)
+        self.bytes_read += sum(size for _, size in ranges)
+        return await self.run(lambda: {addr: read_bytes(addr, size) for addr, size in ranges})
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker thread once its queued calls are done.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SSSharedMemory:
+    """
+    Reads and writes Dolphin's emulated MEM1 through the shared memory object Dolphin creates on Linux
+    (`/dev/shm/dolphin-emu.<pid>`), instead of going through dolphin_memory_engine.
+
+    The object is mapped into this process, so reading it is a memory access rather than a call into Dolphin's
+    process, and doesn't need the worker thread or the read cache. `view` and `unpack` read without copying, while
+    `read_bytes` returns a copy. It has the same functions the client uses from dolphin_memory_engine, so it can be used
+    in its place. Any file at least as large as the addresses read can stand in for the shared memory object, e.g. a
+    RAM dump.
+    """
+
+    MEM1_START = 0x80000000
+    MEM1_SIZE = 0x1800000
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Create the backend. Nothing is mapped until `hook` is called.
+
+        :param path: Path of the shared memory object. Defaults to the most recently created Dolphin object in
+            `/dev/shm`.
+        """
+        self.path = path
+        self.hooked_path: Optional[str] = None
+        self.mm: Optional[mmap.mmap] = None
+        self.mem: Optional[memoryview] = None
+        # Reads from the mapping, and the bytes they read. These don't go through the worker thread.
+        self.reads: int = 0
+        self.bytes_read: int = 0
+
+    def hook(self) -> None:
+        """
+        Map the shared memory object. Does nothing if it doesn't exist.
+        """
+        if self.is_hooked():
+            return
+        self.un_hook()
+        path = self.path
+        if path is None:
+            candidates = glob.glob("/dev/shm/dolphin-emu.*")
+            if not candidates:
+                return
+            path = max(candidates, key=os.path.getmtime)
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except OSError:
+            return
+        try:
+            size = min(os.fstat(fd).st_size, self.MEM1_SIZE)
+            if size:
+                self.mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+                self.mem = memoryview(self.mm)
+                self.hooked_path = path
+        finally:
+            os.close(fd)
+
+    def un_hook(self) -> None:
+        """
+        Unmap the shared memory object.
+        """
+        mem, self.mem = self.mem, None
+        mm, self.mm = self.mm, None
+        self.hooked_path = None
+        if mem is not None:
+            mem.release()
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                # A view from `view` is still alive. The mapping is closed when the last view is released.
+                pass
+
+    def is_hooked(self) -> bool:
+        """
+        Check whether the shared memory object is mapped. Dolphin removes the object when it closes.
+
+        :return: `True` if the object is mapped and still exists, otherwise `False`.
+        """
+        return self.mem is not None and os.path.exists(self.hooked_path)
+
+    def _offset(self, console_address: int, size: int) -> int:
+        """
+        Get the offset of an address in the mapping.
+
+        :param console_address: Address in MEM1.
+        :param size: Number of bytes that will be accessed.
+        :return: The offset.
+        """
+        if self.mem is None:
+            raise RuntimeError("Dolphin's shared memory is not mapped.")
+        offset = console_address - self.MEM1_START
+        if offset < 0 or offset + size > len(self.mem):
+            raise RuntimeError(f"Could not access {size} byte(s) at {console_address:#x}.")
+        return offset
+
+    def view(self, console_address: int, size: int) -> memoryview:
+        """
+        Get a view of memory without copying it. The view sees later changes to memory, so copy anything that has to
+        stay the same. Release it before calling `un_hook`, or the mapping stays open until it is released.
+
+        :param console_address: Address to start the view at.
+        :param size: Number of bytes in the view.
+        :return: The view.
+        """
+        offset = self._offset(console_address, size)
+        self.reads += 1
+        self.bytes_read += size
+        return self.mem[offset : offset + size]
+
+    def unpack(self, fmt: str, console_address: int) -> tuple:
+        """
+        Unpack big-endian values from memory without copying it.
+
+        :param fmt: The `struct` format of the values, without a byte order.
+        :param console_address: Address of the first value.
+        :return: The values.
+        """
+        fmt = ">" + fmt
+        size = struct.calcsize(fmt)
+        self.reads += 1
+        self.bytes_read += size
+        return struct.unpack_from(fmt, self.mem, self._offset(console_address, size))
+
+    def read_bytes(self, console_address: int, size: int) -> bytes:
+        """
+        Read a copy of bytes from memory. Use `view` to read without copying.
+
+        :param console_address: Address to start reading from.
+        :param size: Number of bytes to read.
+        :return: The bytes read.
+        """
+        offset = self._offset(console_address, size)
+        self.reads += 1
+        self.bytes_read += size
+        return self.mem[offset : offset + size].tobytes()
+
+    def read_byte(self, console_address: int) -> int:
+        """
+        Read 1 byte from memory.
+
+        :param console_address: Address to read from.
+        :return: The value read.
+        """
+        offset = self._offset(console_address, 1)
+        self.reads += 1
+        self.bytes_read += 1
+        return self.mem[offset]
+
+    def read_word(self, console_address: int) -> int:
+        """
+        Read a 4-byte word from memory.
+
+        :param console_address: Address to read from.
+        :return: The value read.
+        """
+        return self.unpack("I", console_address)[0]
+
+    def write_byte(self, console_address: int, value: int) -> None:
+        """
+        Write 1 byte to memory.
+
+        :param console_address: Address to write to.
+        :param value: Value to write.
+        """
+        self.mem[self._offset(console_address, 1)] = value
+
+    def write_bytes(self, console_address: int, data: bytes) -> None:
+        """
+        Write bytes to memory.
+
+        :param console_address: Address to start writing at.
+        :param data: Bytes to write.
+        """
+        offset = self._offset(console_address, len(data))
+        self.mem[offset : offset + len(data)] = data
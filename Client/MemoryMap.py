@@ -0,0 +1,149 @@
+import struct
+from enum import Enum, auto
+from functools import lru_cache
+from typing import Any, Iterable, NamedTuple
+
+from ..Constants import *
+
+
+class SSMemType(Enum):
+    """
+    How the bytes of a field in memory are decoded.
+    """
+
+    BYTE = auto()
+    HALFWORD = auto()
+    BYTES = auto()
+    STRING = auto()
+
+
+class SSMemField(NamedTuple):
+    """
+    A field in Dolphin's memory.
+    """
+
+    name: str
+    address: int
+    size: int
+    type: SSMemType
+
+    def decode(self, data: bytes, offset: int = 0) -> Any:
+        """
+        Decode the field's value.
+
+        :param data: Bytes that contain the field.
+        :param offset: Offset of the field in the bytes.
+        :return: The value (an int for bytes and halfwords, a str for strings, otherwise bytes).
+        """
+        if self.type == SSMemType.BYTE:
+            return data[offset]
+        if self.type == SSMemType.HALFWORD:
+            return struct.unpack_from(">H", data, offset)[0]
+        raw = bytes(data[offset : offset + self.size])
+        if self.type == SSMemType.STRING:
+            return raw.split(b"\0", 1)[0].decode()
+        return raw
+
+
+MEMORY_MAP: dict[str, SSMemField] = {
+    field.name: field
+    for field in (
+        SSMemField("game_id", GAME_ID_ADDR, 6, SSMemType.STRING),
+        SSMemField("health", CURR_HEALTH_ADDR, 2, SSMemType.HALFWORD),
+        SSMemField("link_state", CURR_STATE_ADDR, 3, SSMemType.BYTES),
+        SSMemField("link_action", LINK_ACTION_ADDR, 1, SSMemType.BYTE),
+        SSMemField("link_state_ffw", CURR_STATE_ADDR - FFW_MEMORY_OFFSET, 3, SSMemType.BYTES),
+        SSMemField("link_action_ffw", LINK_ACTION_ADDR - FFW_MEMORY_OFFSET, 1, SSMemType.BYTE),
+        SSMemField("minigame_state", MINIGAME_STATE_ADDR, 1, SSMemType.BYTE),
+        SSMemField("selected_file", SELECTED_FILE_ADDR, 1, SSMemType.BYTE),
+        SSMemField("expected_index", EXPECTED_INDEX_ADDR, 2, SSMemType.HALFWORD),
+        SSMemField("stage", CURR_STAGE_ADDR, 16, SSMemType.STRING),
+        SSMemField("give_item_array", ARCHIPELAGO_ARRAY_ADDR, 0x10, SSMemType.BYTES),
+        SSMemField("slot_name", ARCHIPELAGO_ARRAY_ADDR + 0x14, 0x10, SSMemType.BYTES),
+        SSMemField("file_name", FILE_NAME_ADDR, 0x10, SSMemType.BYTES),
+        SSMemField("title_loader", GLOBAL_TITLE_LOADER_ADDR, 1, SSMemType.BYTE),
+        SSMemField("storyflags", STORYFLAG_BLOCK_ADDR, STORYFLAG_BLOCK_SIZE, SSMemType.BYTES),
+        SSMemField("sceneflags", SCENEFLAG_BLOCK_ADDR, SCENEFLAG_BLOCK_SIZE, SSMemType.BYTES),
+    )
+}
+
+
+class SSReadPlan:
+    """
+    The fewest contiguous reads that cover a set of fields in memory.
+
+    Fields are sorted by address, and a field that starts at most `max_gap` bytes after the end of the current range
+    extends that range instead of starting a new read.
+    """
+
+    def __init__(self, fields: Iterable[SSMemField], max_gap: int = READ_PLAN_MAX_GAP):
+        """
+        Plan the reads.
+
+        :param fields: The fields to read.
+        :param max_gap: Largest number of unneeded bytes between two fields that are still read together.
+        """
+        self.fields = sorted(fields, key=lambda field: field.address)
+        self.max_gap = max_gap
+        # (start address, size) of each read.
+        self.ranges: list[tuple[int, int]] = []
+        # Field name -> (start address of the read that covers it, offset of the field in that read).
+        self.locations: dict[str, tuple[int, int]] = {}
+
+        start = end = None
+        for field in self.fields:
+            if start is None or field.address - end > max_gap:
+                if start is not None:
+                    self.ranges.append((start, end - start))
+                start, end = field.address, field.address + field.size
+            else:
+                end = max(end, field.address + field.size)
+            self.locations[field.name] = (start, field.address - start)
+        if start is not None:
+            self.ranges.append((start, end - start))
+
+    def decode(self, ranges: dict[int, bytes]) -> dict[str, Any]:
+        """
+        Decode every field from the reads.
+
+        :param ranges: Start address -> bytes read from that address, for each of the plan's `ranges`.
+        :return: Field name -> value.
+        """
+        values = {}
+        for field in self.fields:
+            start, offset = self.locations[field.name]
+            values[field.name] = field.decode(ranges[start], offset)
+        return values
+
+
+@lru_cache(maxsize=None)
+def make_tick_read_plan(
+    give_item_array_length: int, flags: bool, extra_fields: tuple[SSMemField, ...] = ()
+) -> SSReadPlan:
+    """
+    Plan the reads for one tick of the client.
+    Link's state and action are read from both their usual addresses and the ones used in Flooded Faron Woods, since
+    the stage that decides which of them is used can change during the tick.
+
+    :param give_item_array_length: Number of slots in the give item array.
+    :param flags: Also read the storyflags and sceneflags for location checks.
+    :param extra_fields: Other fields to read this tick, e.g. the slot name or the fields of a trace.
+    :return: The read plan.
+    """
+    fields = [
+        MEMORY_MAP["link_state"],
+        MEMORY_MAP["link_action"],
+        MEMORY_MAP["link_state_ffw"],
+        MEMORY_MAP["link_action_ffw"],
+        MEMORY_MAP["health"],
+        MEMORY_MAP["title_loader"],
+        MEMORY_MAP["selected_file"],
+        MEMORY_MAP["minigame_state"],
+        MEMORY_MAP["stage"],
+        MEMORY_MAP["give_item_array"]._replace(size=give_item_array_length),
+        MEMORY_MAP["expected_index"],
+    ]
+    if flags:
+        fields += [MEMORY_MAP["storyflags"], MEMORY_MAP["sceneflags"]]
+    fields += extra_fields
+    return SSReadPlan(fields)
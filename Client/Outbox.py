@@ -0,0 +1,151 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from CommonClient import logger
+
+
+class SSOutbox:
+    """
+    Messages to the server that are queued during a tick of the sync loop and sent together in one frame.
+
+    Repeated messages are coalesced while they wait: location checks and scouts are merged into one message each, only
+    the latest status update is kept, Bounces to the same targets merge their data, and Sets on the same data storage
+    key merge their operations. While a frame is still being sent to a slow server, nothing new is sent, so the queued
+    messages keep coalescing instead of piling up.
+    """
+
+    def __init__(self, record: Optional[Callable[[str, float], None]] = None):
+        """
+        Create an empty outbox.
+
+        :param record: Optional function called with "sends" and how many seconds each frame took to send.
+        """
+        self.record = record
+        self.location_checks: set[int] = set()
+        # Value of `create_as_hint` -> locations to scout.
+        self.location_scouts: dict[int, set[int]] = {}
+        self.status_update: Optional[dict[str, Any]] = None
+        # (slots, games, tags) -> Bounce to those targets.
+        self.bounces: dict[tuple, dict[str, Any]] = {}
+        # Data storage key -> Set on that key.
+        self.sets: dict[str, dict[str, Any]] = {}
+        # Any other messages, in the order they were queued.
+        self.other: list[dict[str, Any]] = []
+
+        # The frame currently being sent, if any.
+        self.sending: Optional[asyncio.Task[None]] = None
+        self.frames_sent: int = 0
+        self.messages_sent: int = 0
+
+    def __len__(self) -> int:
+        """
+        :return: The number of messages waiting to be sent.
+        """
+        return (
+            bool(self.location_checks)
+            + len(self.location_scouts)
+            + (self.status_update is not None)
+            + len(self.bounces)
+            + len(self.sets)
+            + len(self.other)
+        )
+
+    def queue(self, msg: dict[str, Any]) -> None:
+        """
+        Queue a message to be sent with the next frame, merging it with any queued message it repeats.
+
+        :param msg: The message.
+        """
+        cmd = msg["cmd"]
+        if cmd == "LocationChecks":
+            self.location_checks.update(msg["locations"])
+        elif cmd == "LocationScouts":
+            self.location_scouts.setdefault(msg.get("create_as_hint", 0), set()).update(msg["locations"])
+        elif cmd == "StatusUpdate":
+            self.status_update = msg
+        elif cmd == "Bounce":
+            key = tuple(tuple(msg.get(target, ())) for target in ("slots", "games", "tags"))
+            if key in self.bounces:
+                self.bounces[key]["data"].update(msg.get("data", {}))
+            else:
+                self.bounces[key] = {**msg, "data": dict(msg.get("data", {}))}
+        elif cmd == "Set" and msg["key"] in self.sets:
+            operations = self.sets[msg["key"]]["operations"]
+            for operation in msg["operations"]:
+                # Consecutive updates merge into one.
+                if operation["operation"] == "update" and operations and operations[-1]["operation"] == "update":
+                    operations[-1] = {**operations[-1], "value": {**operations[-1]["value"], **operation["value"]}}
+                else:
+                    operations.append(operation)
+        elif cmd == "Set":
+            self.sets[msg["key"]] = {**msg, "operations": list(msg["operations"])}
+        else:
+            self.other.append(msg)
+
+    def take(self) -> list[dict[str, Any]]:
+        """
+        Remove all queued messages.
+        Location checks come before the status update, so a goal is never reported ahead of its checks.
+
+        :return: The queued messages.
+        """
+        msgs = []
+        if self.location_checks:
+            msgs.append({"cmd": "LocationChecks", "locations": self.location_checks})
+        for create_as_hint, locations in self.location_scouts.items():
+            msgs.append({"cmd": "LocationScouts", "locations": locations, "create_as_hint": create_as_hint})
+        if self.status_update is not None:
+            msgs.append(self.status_update)
+        msgs.extend(self.sets.values())
+        msgs.extend(self.bounces.values())
+        msgs.extend(self.other)
+        self.clear()
+        return msgs
+
+    def clear(self) -> None:
+        """
+        Drop all queued messages.
+        """
+        self.location_checks = set()
+        self.location_scouts = {}
+        self.status_update = None
+        self.bounces = {}
+        self.sets = {}
+        self.other = []
+
+    def flush(self, send_msgs: Callable[[list[dict[str, Any]]], Awaitable[None]]) -> bool:
+        """
+        Start sending all queued messages in one frame, unless the previous frame is still being sent.
+
+        :param send_msgs: Coroutine function that sends a list of messages to the server in one frame.
+        :return: `True` if a frame was started, otherwise `False`.
+        """
+        if not self or (self.sending is not None and not self.sending.done()):
+            return False
+        msgs = self.take()
+        self.frames_sent += 1
+        self.messages_sent += len(msgs)
+        self.sending = asyncio.create_task(self._send(send_msgs, msgs), name="SSOutbox")
+        return True
+
+    async def _send(
+        self, send_msgs: Callable[[list[dict[str, Any]]], Awaitable[None]], msgs: list[dict[str, Any]]
+    ) -> None:
+        """
+        Send a frame, logging any error instead of raising it.
+
+        :param send_msgs: Coroutine function that sends a list of messages to the server in one frame.
+        :param msgs: The messages.
+        """
+        start = time.perf_counter()
+        try:
+            await send_msgs(msgs)
+        except Exception as e:
+            logger.error(f"Failed to send {len(msgs)} message(s) to the server: {e}")
+        if self.record is not None:
+            self.record("sends", time.perf_counter() - start)
+        # Send whatever was queued while this frame was being sent.
+        self.sending = None
+        if self:
+            self.flush(send_msgs)
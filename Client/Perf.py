@@ -0,0 +1,119 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Get a percentile of some values by the nearest-rank method.
+
+    :param values: The values.
+    :param p: The percentile, from 0 to 100.
+    :return: The value at that percentile, or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, math.ceil(p * len(values) / 100) - 1)]
+
+
+class SSPerfPhase:
+    """
+    Timings of one phase of the client, e.g. evaluating locations.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Create an empty phase.
+
+        :param window: Number of most recent timings the percentiles are computed from.
+        """
+        self.count: int = 0
+        self.total: float = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """
+        Record one run of the phase.
+
+        :param seconds: How long it took.
+        """
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        :return: The number of runs, and the mean and percentiles of the recent runs in milliseconds.
+        """
+        samples = list(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+
+
+class SSPerfStats:
+    """
+    Timings of each phase of the client, and the number of sync loop ticks and the memory reads they made.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Create empty statistics.
+
+        :param window: Number of most recent timings of each phase the percentiles are computed from.
+        """
+        self.window = window
+        self.phases: dict[str, SSPerfPhase] = {}
+        self.ticks: int = 0
+        # Reads from Dolphin memory made by the ticks, and the bytes they read.
+        self.tick_reads: int = 0
+        self.tick_bytes_read: int = 0
+        self.start_time: float = time.monotonic()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Record one run of a phase.
+
+        :param phase: Name of the phase.
+        :param seconds: How long it took.
+        """
+        if phase not in self.phases:
+            self.phases[phase] = SSPerfPhase(self.window)
+        self.phases[phase].record(seconds)
+
+    def record_tick(self, reads: int, bytes_read: int) -> None:
+        """
+        Record one tick of the sync loop.
+
+        :param reads: Number of reads from Dolphin memory made during the tick.
+        :param bytes_read: Number of bytes those reads read.
+        """
+        self.ticks += 1
+        self.tick_reads += reads
+        self.tick_bytes_read += bytes_read
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """
+        Time the code in a `with` block as one run of a phase.
+
+        :param phase: Name of the phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        :return: Phase name -> summary of the phase's timings.
+        """
+        return {name: phase.summary() for name, phase in self.phases.items()}
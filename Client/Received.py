@@ -0,0 +1,80 @@
+from typing import Iterable, Optional
+
+from NetUtils import NetworkItem
+
+
+class SSReceivedItems:
+    """
+    The items the server has sent to this slot, stored by their index in the slot's list of received items.
+
+    The player's expected index (saved with their file) is the index of the next item to give them, so the next
+    undelivered items are looked up directly by index instead of searching every received item.
+    """
+
+    def __init__(self):
+        """
+        Create an empty store.
+        """
+        # Index -> item. `None` marks an index the server hasn't sent yet.
+        self.items: list[Optional[NetworkItem]] = []
+
+    def __len__(self) -> int:
+        """
+        :return: The index after the last received item.
+        """
+        return len(self.items)
+
+    def clear(self) -> None:
+        """
+        Forget all received items. The server sends the full list again after connecting.
+        """
+        self.items = []
+
+    def add(self, index: int, items: Iterable[NetworkItem]) -> None:
+        """
+        Store items from a `ReceivedItems` packet. Items the server sends again replace the stored ones.
+
+        :param index: Index of the first item in the packet.
+        :param items: The items in the packet, in order.
+        """
+        items = list(items)
+        end = index + len(items)
+        if end > len(self.items):
+            self.items.extend([None] * (end - len(self.items)))
+        self.items[index:end] = items
+
+    def get(self, index: int) -> Optional[NetworkItem]:
+        """
+        Get the item received at an index.
+
+        :param index: Index of the item.
+        :return: The item, or `None` if it hasn't been received.
+        """
+        if 0 <= index < len(self.items):
+            return self.items[index]
+        return None
+
+    def pending(self, expected_idx: int, count: int) -> list[tuple[NetworkItem, int]]:
+        """
+        Get the next items the player has yet to receive.
+
+        :param expected_idx: The player's expected index.
+        :param count: The most items to return.
+        :return: Up to `count` consecutive items starting at the expected index, with their indices.
+        """
+        batch = []
+        for idx in range(max(expected_idx, 0), min(expected_idx + count, len(self.items))):
+            item = self.items[idx]
+            if item is None:
+                break
+            batch.append((item, idx))
+        return batch
+
+    def pending_count(self, expected_idx: int) -> int:
+        """
+        Count the items the player has yet to receive.
+
+        :param expected_idx: The player's expected index.
+        :return: The number of received items at or after the expected index.
+        """
+        return max(len(self.items) - max(expected_idx, 0), 0)
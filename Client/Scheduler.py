@@ -0,0 +1,167 @@
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+if TYPE_CHECKING:
+    from ..SSClient import SSContext
+
+
+class SSSyncJob:
+    """
+    A job run periodically by the Dolphin sync loop.
+
+    The job function may return `True` if it saw any activity (e.g. a flag changed) and `False` if it didn't. After
+    `idle_after` seconds without activity, the job's interval doubles each run until it reaches `idle_interval`. Any
+    activity resets it to the base interval. Jobs that return `None` always run at their base interval.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[["SSContext"], Awaitable[Optional[bool]]],
+        interval: float,
+        priority: int,
+        idle_interval: Optional[float] = None,
+        idle_after: float = 5.0,
+        enabled: Optional[Callable[["SSContext"], bool]] = None,
+    ):
+        """
+        Create a sync job.
+
+        :param name: Name of the job.
+        :param func: Coroutine function to run, called with the client context.
+        :param interval: Seconds between runs while there is activity.
+        :param priority: Jobs that are due at the same time run in ascending order of priority.
+        :param idle_interval: Longest interval to back off to while idle. Defaults to never backing off.
+        :param idle_after: Seconds without activity before the job starts backing off.
+        :param enabled: Optional check whether the job should run at all, called with the client context.
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.idle_interval = interval if idle_interval is None else idle_interval
+        self.idle_after = idle_after
+        self.enabled = enabled
+
+        self.current_interval: float = interval
+        self.next_run: float = 0.0
+        self.last_activity: float = 0.0
+
+    def reset(self, now: float) -> None:
+        """
+        Run the job as soon as possible at its base interval.
+
+        :param now: The current time.
+        """
+        self.current_interval = self.interval
+        self.next_run = now
+        self.last_activity = now
+
+    async def run(self, ctx: "SSContext", now: float) -> None:
+        """
+        Run the job and schedule its next run.
+
+        :param ctx: The SS client context.
+        :param now: The current time.
+        """
+        active = await self.func(ctx)
+        if active or active is None:
+            self.last_activity = now
+            self.current_interval = self.interval
+        elif now - self.last_activity >= self.idle_after:
+            self.current_interval = min(self.current_interval * 2, self.idle_interval)
+        self.next_run = now + self.current_interval
+
+
+class SSSyncScheduler:
+    """
+    Runs each sync job at its own rate, and backs off while the player isn't in game.
+    """
+
+    def __init__(
+        self,
+        jobs: list[SSSyncJob],
+        min_backoff: float = 0.1,
+        max_backoff: float = 1.0,
+        slack: float = 0.005,
+        record: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        Create a scheduler.
+
+        :param jobs: The jobs to run.
+        :param min_backoff: Seconds to wait the first time the player isn't in game.
+        :param max_backoff: Longest time to wait while the player isn't in game.
+        :param slack: Jobs that are due within this many seconds run early, together with the jobs that are due now.
+        :param record: Optional function called with the name of each job run and how many seconds it took.
+        """
+        self.jobs = sorted(jobs, key=lambda job: job.priority)
+        self.record = record
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.slack = slack
+        self.backoff: float = 0.0
+        now = time.monotonic()
+        for job in self.jobs:
+            job.reset(now)
+
+    def job(self, name: str) -> SSSyncJob:
+        """
+        Get a job by name.
+
+        :param name: Name of the job.
+        :return: The job.
+        """
+        return next(job for job in self.jobs if job.name == name)
+
+    def pause(self) -> float:
+        """
+        Back off while the player isn't in game. Each call doubles the wait, up to `max_backoff`.
+
+        :return: Seconds to wait before checking whether the player is in game again.
+        """
+        self.backoff = min(max(self.backoff * 2, self.min_backoff), self.max_backoff)
+        return self.backoff
+
+    def resume(self) -> None:
+        """
+        Run every job as soon as possible after the player is back in game.
+        """
+        if self.backoff:
+            self.backoff = 0.0
+            now = time.monotonic()
+            for job in self.jobs:
+                job.reset(now)
+
+    def is_due(self, ctx: "SSContext", name: str) -> bool:
+        """
+        Check whether a job will run the next time `run` is called, if that is right away.
+
+        :param ctx: The SS client context.
+        :param name: Name of the job.
+        :return: `True` if the job is enabled and due, otherwise `False`.
+        """
+        job = self.job(name)
+        if job.enabled is not None and not job.enabled(ctx):
+            return False
+        return bool(self.backoff) or time.monotonic() + self.slack >= job.next_run
+
+    async def run(self, ctx: "SSContext") -> float:
+        """
+        Run every enabled job that is due, or due within `slack` seconds.
+
+        :param ctx: The SS client context.
+        :return: Seconds until the next enabled job is due.
+        """
+        self.resume()
+        enabled_jobs = [job for job in self.jobs if job.enabled is None or job.enabled(ctx)]
+        for job in enabled_jobs:
+            now = time.monotonic()
+            if now + self.slack >= job.next_run:
+                await job.run(ctx, now)
+                if self.record is not None:
+                    self.record(job.name, time.monotonic() - now)
+        # Disabled jobs don't wake the loop. They run as soon as they are enabled, since they were due all along.
+        if not enabled_jobs:
+            return self.max_backoff
+        return max(0.0, min(job.next_run for job in enabled_jobs) - time.monotonic())
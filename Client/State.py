@@ -0,0 +1,151 @@
+import json
+import os
+from typing import Any, Iterable, Optional
+
+import Utils
+
+
+class SSClientState:
+    """
+    Client state for one slot of one seed, kept on disk so a restarted or reconnected client resumes where it left off.
+
+    The file is in JSON lines format. Each line updates part of the state, so every change is appended to the file as
+    it happens and nothing is lost if the client crashes. A line cut off by a crash is ignored. Loading the file
+    compacts it into a single line.
+    """
+
+    def __init__(self, path: str):
+        """
+        Create an empty state. Call `load` to read it from disk.
+
+        :param path: Path of the state file.
+        """
+        self.path = path
+        self.visited_stages: set[str] = set()
+        self.beedle_items_purchased: list[int] = [0, 0, 0, 0]
+        # Locations scouted for hints.
+        self.scouted_locations: set[int] = set()
+        # Locations checked in-game, whether or not the server has confirmed them.
+        self.checked_locations: set[int] = set()
+        # Flag snapshot from the last location check that changed any flag.
+        self.flag_snapshot: Optional[bytes] = None
+
+    @classmethod
+    def for_slot(cls, seed_name: str, team: int, slot: int) -> "SSClientState":
+        """
+        Load the state of a slot.
+
+        :param seed_name: Name of the seed.
+        :param team: The slot's team.
+        :param slot: The slot.
+        :return: The state.
+        """
+        state = cls(Utils.cache_path("ss_client_state", f"{seed_name}_{team}_{slot}.jsonl"))
+        state.load()
+        return state
+
+    def load(self) -> None:
+        """
+        Read the state from disk, then compact the file.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as state_file:
+                for line in state_file:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, TypeError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+        self.compact()
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """
+        Apply one line of the state file.
+
+        :param record: The decoded line.
+        """
+        self.visited_stages.update(record.get("visited_stages", ()))
+        if "beedle_items_purchased" in record:
+            self.beedle_items_purchased = list(record["beedle_items_purchased"])
+        self.scouted_locations.update(record.get("scouted_locations", ()))
+        self.checked_locations.update(record.get("checked_locations", ()))
+        if "flag_snapshot" in record:
+            self.flag_snapshot = bytes.fromhex(record["flag_snapshot"])
+
+    def _record(self) -> dict[str, Any]:
+        """
+        :return: The whole state as one line of the state file.
+        """
+        record = {
+            "visited_stages": sorted(self.visited_stages),
+            "beedle_items_purchased": self.beedle_items_purchased,
+            "scouted_locations": sorted(self.scouted_locations),
+            "checked_locations": sorted(self.checked_locations),
+        }
+        if self.flag_snapshot is not None:
+            record["flag_snapshot"] = self.flag_snapshot.hex()
+        return record
+
+    def compact(self) -> None:
+        """
+        Rewrite the state file as a single line.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            state_file.write(json.dumps(self._record()) + "\n")
+        os.replace(temp_path, self.path)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """
+        Append a change to the state file.
+
+        :param record: The changed part of the state.
+        """
+        with open(self.path, "a", encoding="utf-8") as state_file:
+            state_file.write(json.dumps(record) + "\n")
+
+    def add_visited_stages(self, stages: Iterable[str]) -> None:
+        """
+        Remember that stages were visited.
+
+        :param stages: Names of the stages.
+        """
+        new_stages = set(stages) - self.visited_stages
+        if new_stages:
+            self.visited_stages |= new_stages
+            self._append({"visited_stages": sorted(new_stages)})
+
+    def set_beedle_items_purchased(self, purchased: list[int]) -> None:
+        """
+        Remember how many items have been bought from each of Beedle's shop slots.
+
+        :param purchased: Items bought from each slot, from left to right.
+        """
+        if purchased != self.beedle_items_purchased:
+            self.beedle_items_purchased = list(purchased)
+            self._append({"beedle_items_purchased": self.beedle_items_purchased})
+
+    def add_scouted_locations(self, apids: Iterable[int]) -> None:
+        """
+        Remember that locations were scouted.
+
+        :param apids: AP IDs of the locations.
+        """
+        new_apids = set(apids) - self.scouted_locations
+        if new_apids:
+            self.scouted_locations |= new_apids
+            self._append({"scouted_locations": sorted(new_apids)})
+
+    def add_checked_locations(self, apids: Iterable[int], flag_snapshot: bytes) -> None:
+        """
+        Remember the locations checked in-game, and the flags they were found in.
+
+        :param apids: AP IDs of the newly checked locations.
+        :param flag_snapshot: The flag snapshot.
+        """
+        new_apids = set(apids) - self.checked_locations
+        self.checked_locations |= new_apids
+        self.flag_snapshot = flag_snapshot
+        self._append({"checked_locations": sorted(new_apids), "flag_snapshot": flag_snapshot.hex()})
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from .. import SSClient
+from ..Locations import LOCATION_TABLE, SSLocation
+from .FakeDolphin import SSFakeDolphin
+from .Feed import diff_runs
+from .MemoryMap import MEMORY_MAP, SSMemField
+
+TRACE_MAGIC = b"SSTRACE\x01"
+
+# Fields recorded in a trace: the flag blocks and everything the client reads to decide whether Link can send or
+# receive items.
+TRACE_FIELDS: list[SSMemField] = [
+    MEMORY_MAP[name]
+    for name in (
+        "storyflags",
+        "sceneflags",
+        "link_state",
+        "link_action",
+        "link_state_ffw",
+        "link_action_ffw",
+        "health",
+        "stage",
+        "title_loader",
+        "selected_file",
+        "minigame_state",
+        "give_item_array",
+        "slot_name",
+    )
+]
+
+# Changed bytes that are at most this many bytes apart are stored as one run.
+TRACE_RUN_MAX_GAP = 4
+
+
+def write_varint(output: BinaryIO, value: int) -> None:
+    """
+    Write an unsigned LEB128 integer.
+
+    :param output: The file to write to.
+    :param value: The integer.
+    """
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            output.write(bytes([byte | 0x80]))
+        else:
+            output.write(bytes([byte]))
+            return
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Read an unsigned LEB128 integer.
+
+    :param data: The bytes to read from.
+    :param pos: Position to start reading at.
+    :return: The integer and the position after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+class SSTraceRecorder:
+    """
+    Records the flag blocks and Link's state from Dolphin's memory to a file during a session.
+
+    The trace starts with a header that lists the recorded fields. Each tick in which anything changed adds a frame: the
+    milliseconds since the previous frame, followed by only the runs of bytes that changed. The first frame holds every
+    byte, since it is compared against zeros.
+    """
+
+    def __init__(self, path: str, fields: list[SSMemField] = TRACE_FIELDS):
+        """
+        Start a trace.
+
+        :param path: Path of the trace file. It is overwritten.
+        :param fields: The fields to record.
+        """
+        self.fields = fields
+        self.size = sum(field.size for field in fields)
+        self.last_snapshot = bytes(self.size)
+        self.last_frame_time = self.start_time = time.monotonic()
+        self.last_flush_time = self.start_time
+        self.frames: int = 0
+
+        self.output: BinaryIO = open(path, "wb")
+        header = json.dumps({"fields": [[field.name, field.address, field.size] for field in fields]}).encode()
+        self.output.write(TRACE_MAGIC)
+        write_varint(self.output, len(header))
+        self.output.write(header)
+
+    def record(self, read_bytes: Callable[[int, int], bytes]) -> None:
+        """
+        Record a frame if any field changed since the last one.
+
+        :param read_bytes: Function that reads a number of bytes from Dolphin memory at an address.
+        """
+        snapshot = b"".join(read_bytes(field.address, field.size) for field in self.fields)
+        if snapshot == self.last_snapshot:
+            return
+        now = time.monotonic()
+        runs = diff_runs(self.last_snapshot, snapshot, TRACE_RUN_MAX_GAP)
+        write_varint(self.output, round((now - self.last_frame_time) * 1000))
+        write_varint(self.output, len(runs))
+        end = 0
+        for offset, data in runs:
+            write_varint(self.output, offset - end)
+            write_varint(self.output, len(data))
+            self.output.write(data)
+            end = offset + len(data)
+        self.last_snapshot = snapshot
+        # Keep the time of each frame relative to the previous one exact, however the milliseconds were rounded.
+        self.last_frame_time += round((now - self.last_frame_time) * 1000) / 1000
+        self.frames += 1
+        if now - self.last_flush_time >= 1.0:
+            self.output.flush()
+            self.last_flush_time = now
+
+    def close(self) -> None:
+        """
+        Finish the trace.
+        """
+        self.output.close()
+
+
+class SSTrace:
+    """
+    A recorded trace, read back frame by frame.
+    """
+
+    def __init__(self, path: str):
+        """
+        Read a trace.
+
+        :param path: Path of the trace file.
+        """
+        with open(path, "rb") as trace:
+            data = trace.read()
+        if not data.startswith(TRACE_MAGIC):
+            raise ValueError(f"{path} is not a Skyward Sword client trace.")
+        header_size, pos = read_varint(data, len(TRACE_MAGIC))
+        header = json.loads(data[pos : pos + header_size])
+        self.fields = [
+            SSMemField(name, address, size, MEMORY_MAP[name].type) for name, address, size in header["fields"]
+        ]
+        self.size = sum(field.size for field in self.fields)
+        self.data = data
+        self.frames_start = pos + header_size
+
+    def frames(self) -> Iterator[tuple[float, bytes]]:
+        """
+        Decode the frames.
+
+        :return: (seconds since the previous frame, full snapshot of every field) for each frame.
+        """
+        data = self.data
+        pos = self.frames_start
+        snapshot = bytearray(self.size)
+        while pos < len(data):
+            delay_ms, pos = read_varint(data, pos)
+            run_count, pos = read_varint(data, pos)
+            end = 0
+            for _ in range(run_count):
+                skip, pos = read_varint(data, pos)
+                size, pos = read_varint(data, pos)
+                offset = end + skip
+                snapshot[offset : offset + size] = data[pos : pos + size]
+                pos += size
+                end = offset + size
+            yield delay_ms / 1000, bytes(snapshot)
+
+    def apply(self, fake: SSFakeDolphin, snapshot: bytes, skip: tuple[str, ...] = ("give_item_array",)) -> None:
+        """
+        Write a snapshot into a fake Dolphin's memory.
+
+        :param fake: The fake Dolphin.
+        :param snapshot: A snapshot from `frames`.
+        :param skip: Fields not to write.
+        """
+        offset = 0
+        for field in self.fields:
+            if field.name not in skip:
+                fake.poke(field.address, snapshot[offset : offset + field.size])
+            offset += field.size
+
+    async def play(self, fake: SSFakeDolphin, speed: float = 1.0) -> None:
+        """
+        Play the trace back into a fake Dolphin in real time, or faster.
+        The give item array is left alone, so the fake game takes items the client gives it as usual.
+
+        :param fake: The fake Dolphin.
+        :param speed: How many times faster than real time to play the trace.
+        """
+        for delay, snapshot in self.frames():
+            if delay:
+                await asyncio.sleep(delay / speed)
+            self.apply(fake, snapshot)
+
+
+async def replay(path: str, speed: float) -> None:
+    """
+    Run the client against a trace played back into a fake Dolphin, and print every location check and scout the
+    stand-in server receives as one JSON object per line.
+
+    :param path: Path of the trace file.
+    :param speed: How many times faster than real time to play the trace.
+    """
+    from .Benchmark import make_context, run_client
+
+    trace = SSTrace(path)
+    fake = SSFakeDolphin()
+    SSClient.use_memory_backend(fake)
+    ctx = make_context(fake)
+    server = ctx.server.socket
+    apid_to_name = {
+        SSLocation.get_apid(data.code): name for name, data in LOCATION_TABLE.items() if data.code is not None
+    }
+
+    async def play() -> dict:
+        start = time.perf_counter()
+        await trace.play(fake, speed)
+        # Give the client a moment to send whatever the last frames checked.
+        await asyncio.sleep(1)
+        for received, msg in server.received:
+            if msg["cmd"] in ("LocationChecks", "LocationScouts"):
+                names = [apid_to_name.get(apid, apid) for apid in msg["locations"]]
+                print(json.dumps({"time": received - start, "cmd": msg["cmd"], "locations": names}), flush=True)
+        return {}
+
+    await run_client(fake, ctx, speed, play)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Replay a trace recorded with the client's `--record-trace` option.
+    From the Archipelago directory, run `python -m worlds.ss.Client.Trace <trace>`.
+
+    :param argv: Command line arguments. Defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description="Replay a Skyward Sword client trace.")
+    parser.add_argument("trace", help="Path of the trace file.")
+    parser.add_argument("--speed", type=float, default=20.0, help="How many times faster than real time to replay.")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    asyncio.run(replay(args.trace, args.speed))
+    SSClient.dme_worker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
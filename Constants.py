@@ -1,3 +1,7 @@
+# The game ID of the running game is at the start of MEM1. Skyward Sword's is SOUE01.
+GAME_ID_ADDR = 0x80000000  # STRING[6]
+SS_GAME_ID = "SOUE01"
+
 # This address is used to check/set the player's health for DeathLink.
 CURR_HEALTH_ADDR = 0x8095A76A  # HALFWORD
 
@@ -48,6 +52,10 @@ CURR_STAGE_ADDR = 0x805B388C  # STRING[16]
 ARCHIPELAGO_ARRAY_ADDR = 0x80678770 # ARRAY[16]
 # WILL BE UPDATED WHEN THE BUILD IS RELEASED
 
+# Number of slots in the array above that the patched game gives items from. Sent to the client in the slot data, since
+# it depends on the build of the game the seed was patched with.
+GIVE_ITEM_ARRAY_LENGTH = 0x1 # TODO CHANGE TO 0x10 WHEN GAME IS FIXED
+
 # This is the address that holds the player's file name.
 FILE_NAME_ADDR = 0x80955D38  # ARRAY[16]
 
@@ -56,6 +64,28 @@ GLOBAL_TITLE_LOADER_ADDR = 0x80575780
 
 AP_VISITED_STAGE_NAMES_KEY_FORMAT = "ss_visited_stages_%i"
 
+# Seconds to wait for the server to confirm a location check or scout before sending it again.
+CHECK_RESEND_TIMEOUT = 5.0
+
+# Seconds to collect newly visited stages for before sending them to the server's data storage as one update.
+VISITED_STAGES_FLUSH_DELAY = 2.0
+
+# While waiting for the game to take an item, poll its memory starting at about once per frame, doubling the delay each
+# poll up to the maximum.
+ITEM_POLL_MIN_DELAY = 1 / 60
+ITEM_POLL_MAX_DELAY = 0.1
+
+# Seconds to wait before trying again while the player can't receive items, doubling up to the maximum.
+ITEM_RETRY_MIN_DELAY = 0.1
+ITEM_RETRY_MAX_DELAY = 1.0
+
+# Seconds to wait before trying to hook into Dolphin again, doubling after each failed attempt up to the maximum.
+DOLPHIN_HOOK_MIN_DELAY = 0.25
+DOLPHIN_HOOK_MAX_DELAY = 5.0
+
+# Seconds between writing the client's performance statistics when run with `--perf-log`.
+PERF_LOG_INTERVAL = 10.0
+
 LINK_INVALID_STATES = [
     b'\x00\x00\x00',
     b'\x5A\x2C\x88', # Loading zone
@@ -108,6 +138,18 @@ STAGE_TO_SCENEFLAG_ADDR = {
     "Skyloft Silent Realm": 0x80957058,
 }
 
+# The storyflags are stored in one contiguous block, so they can all be read at once.
+STORYFLAG_BLOCK_ADDR = 0x805A9AD0
+STORYFLAG_BLOCK_SIZE = 0x80
+
+# The saved sceneflags above are contiguous as well (including a few unused scene indices), so they can be read at once.
+SCENEFLAG_BLOCK_ADDR = min(STAGE_TO_SCENEFLAG_ADDR.values())
+SCENEFLAG_BLOCK_SIZE = max(STAGE_TO_SCENEFLAG_ADDR.values()) + 0x10 - SCENEFLAG_BLOCK_ADDR
+
+# Reads that are at most this many bytes apart are merged into one read of the whole range, since each call into
+# Dolphin costs far more than the extra bytes read.
+READ_PLAN_MAX_GAP = 0x400
+
 # DME Connection Messages for the client
 CONNECTION_REFUSED_GAME_STATUS = "Dolphin failed to connect. Please load a randomized ROM for Skyward Sword. Trying again in 5 seconds..."
 CONNECTION_REFUSED_SAVE_STATUS = "Dolphin failed to connect. Please load into the save file. Trying again in 5 seconds..."
@@ -122,6 +164,8 @@ FORCED_OPTIONS = {
     "random_start_statues": 0, # False
 }
 
+ORIGIN_REGION = "Upper Skyloft"
+
 OVERWORLD_REGIONS = {  # Region: Connected regions
     "Upper Skyloft": ["Central Skyloft", "Sky"],
     "Central Skyloft": ["Upper Skyloft", "Skyloft Village", "Beedle's Shop", "Sky"],
@@ -228,6 +272,23 @@ VANILLA_TRIAL_CONNECTIONS = {
     "Lanayru Silent Realm": "trial_gate_in_lanayru_desert",
 }
 
+DUNGEON_ENTRANCE_REGIONS = {  # Dungeon entrance: Region the entrance is in
+    "dungeon_entrance_in_deep_woods": "Faron Woods",
+    "dungeon_entrance_in_lake_floria": "Lake Floria",
+    "dungeon_entrance_in_eldin_volcano": "Eldin Volcano",
+    "dungeon_entrance_in_volcano_summit": "Volcano Summit",
+    "dungeon_entrance_in_lanayru_desert": "Lanayru Desert",
+    "dungeon_entrance_in_lanayru_sand_sea": "Lanayru Sand Sea",
+    "dungeon_entrance_on_skyloft": "Central Skyloft",
+}
+
+TRIAL_GATE_REGIONS = {  # Trial gate: Region the gate is in
+    "trial_gate_on_skyloft": "Central Skyloft",
+    "trial_gate_in_faron_woods": "Faron Woods",
+    "trial_gate_in_eldin_volcano": "Eldin Volcano",
+    "trial_gate_in_lanayru_desert": "Lanayru Desert",
+}
+
 SWORD_COUNTS = {
     "swordless": 0,
     "practice_sword": 1,
@@ -59,13 +59,14 @@ class SSLocCheckedFlag(Flag):
     Either scene flag or story flag. Determines what is checked to see
     if the location has been checked by the player.
 
-    Special [SPECL] flag may require checking multiple flags. Flags are hardcoded during
-    flag checking.
+    Locations checked by multiple flags use [ANY] (any of the flags is set) or
+    [ALL] (all of the flags are set), followed by a list of scene/story flags.
     """
 
     STORY = auto()
     SCENE = auto()
-    SPECL = auto()
+    ANY = auto()
+    ALL = auto()
 
 
 class SSLocData(NamedTuple):
@@ -82,6 +83,7 @@ class SSLocData(NamedTuple):
     checked_flag: list[
         SSLocCheckedFlag, int, int, any
     ]  # [ Flag_type, flag_bit (0x0-0xF), flag_value (0x01-0x80), scene (string) OR story flag address (ending in zero)]
+    # OR [ ANY/ALL, [ list of the above scene/story flags ] ]
     hint: Optional[SSHintType] = None
 
 
@@ -231,11 +233,12 @@ LOCATION_TABLE: dict[str, SSLocData] = {
         "Gratitude Crystal Pack",
         SSLocType.EVENT,
         [
-            SSLocCheckedFlag.SPECL,
-            0x0,
-            0x0,
-            0x0,
-        ],  # SPECIAL - 2 story flags, determined later; index 0x0
+            SSLocCheckedFlag.ANY,
+            [
+                [SSLocCheckedFlag.STORY, 0x6, 0x80, 0x805A9B10],  # 5 crystals from Pipit
+                [SSLocCheckedFlag.STORY, 0x6, 0x04, 0x805A9B10],  # 5 crystals from Ghost
+            ],
+        ],
     ),
     "Upper Skyloft - Pumpkin Archery -- 600 Points": SSLocData(
         12,
@@ -328,11 +331,12 @@ LOCATION_TABLE: dict[str, SSLocData] = {
         "Gratitude Crystal Pack",
         SSLocType.EVENT,
         [
-            SSLocCheckedFlag.SPECL,
-            0x1,
-            0x0,
-            0x0,
-        ],  # SPECIAL - 2 flags, determined later; index 0x1
+            SSLocCheckedFlag.ANY,
+            [
+                [SSLocCheckedFlag.STORY, 0xA, 0x40, 0x805A9B10],  # 5 crystals from Peatrice
+                [SSLocCheckedFlag.STORY, 0xD, 0x02, 0x805A9B10],  # 5 crystals from Peater
+            ],
+        ],
         SSHintType.ALWAYS,
     ),
     "Central Skyloft - Item in Bird Nest": SSLocData(
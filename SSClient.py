@@ -1,7 +1,10 @@
 import asyncio
+import json
 import time
 import traceback
-from typing import TYPE_CHECKING, Any, Optional
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Union
 
 import dolphin_memory_engine
 
@@ -17,13 +20,25 @@ from CommonClient import (
 from NetUtils import ClientStatus, NetworkItem
 
 from .Items import ITEM_TABLE, LOOKUP_ID_TO_NAME
-from .Locations import LOCATION_TABLE, SSLocation, SSLocFlag, SSLocType, SSLocCheckedFlag
-from .Hints import HINT_TABLE, SSHint
+from .Locations import LOCATION_TABLE, SSLocation
+from .Hints import HINT_TABLE
 from .Constants import *
+from .Client.Flags import HINT_FLAG_CHECKS, LOCATION_FLAG_CHECKS
+from .Client.Feed import TRACKER_FEED_KEY, TRACKER_FEED_RESYNC_KEY, SSTrackerFeed, location_bitset
+from .Client.Logic import SSLogicTracker
+from .Client.Memory import SSMemoryWorker, SSReadCache, SSSharedMemory
+from .Client.MemoryMap import MEMORY_MAP, SSReadPlan, make_tick_read_plan
+from .Client.Outbox import SSOutbox
+from .Client.Perf import SSPerfStats
+from .Client.Received import SSReceivedItems
+from .Client.State import SSClientState
+from .Client.Scheduler import SSSyncJob, SSSyncScheduler
 
 if TYPE_CHECKING:
     import kvui
 
+    from .Client.Trace import SSTraceRecorder
+
 
 class SSCommandProcessor(ClientCommandProcessor):
     """
@@ -45,6 +60,39 @@ class SSCommandProcessor(ClientCommandProcessor):
         if isinstance(self.ctx, SSContext):
             logger.info(f"Dolphin Status: {self.ctx.dolphin_status}")
 
+    def _cmd_perf(self) -> None:
+        """
+        Display timings of each phase of the client, memory reads and queue depths.
+        """
+        if isinstance(self.ctx, SSContext):
+            summary = perf_summary(self.ctx)
+            for name, phase in summary["phases"].items():
+                logger.info(
+                    f"{name}: {phase['count']} calls, p50 {phase['p50_ms']:.2f} ms, p95 {phase['p95_ms']:.2f} ms, "
+                    f"p99 {phase['p99_ms']:.2f} ms"
+                )
+            logger.info(
+                f"Memory: {summary['reads_per_tick']:.1f} reads and {summary['bytes_per_tick']:.0f} bytes per tick "
+                f"over {summary['ticks']} ticks ({summary['reads']} reads, {summary['bytes_read']} bytes in total)"
+            )
+            logger.info(
+                f"Queues: {summary['pending_items']} pending items, {summary['unsent_checks']} unconfirmed checks, "
+                f"{summary['unsent_scouts']} unconfirmed scouts, {summary['queued_messages']} queued messages"
+            )
+
+    def _cmd_logic(self) -> None:
+        """
+        List the unchecked locations that are in logic with the items collected so far.
+        """
+        if isinstance(self.ctx, SSContext):
+            if self.ctx.logic_tracker is None:
+                logger.info("Logic tracking isn't available. It needs a seed generated with this version of the world.")
+                return
+            locations = locations_in_logic(self.ctx)
+            logger.info(f"{len(locations)} unchecked location(s) in logic:")
+            for location in locations:
+                logger.info(location)
+
 
 class SSContext(CommonContext):
     """
@@ -66,15 +114,33 @@ class SSContext(CommonContext):
         """
 
         super().__init__(server_address, password)
-        self.items_rcvd: list[tuple[NetworkItem, int]] = []
+        # Items received from the server, by index. The next items to give start at the player's expected index.
+        self.items_rcvd: SSReceivedItems = SSReceivedItems()
         self.dolphin_sync_task: Optional[asyncio.Task[None]] = None
         self.dolphin_status: str = CONNECTION_INITIAL_STATUS
         self.awaiting_rom: bool = False
-        self.last_rcvd_index: int = -1
         self.has_send_death: bool = False
-        self.locations_for_hint: dict[str, list] = {}
+        # Hint name -> AP IDs of the locations that hint points to. Resolved once from the slot data on connecting.
+        self.hint_location_apids: dict[str, frozenset[int]] = {}
         self.beedle_items_purchased = [0, 0, 0, 0] # slots from left to right
 
+        # Flag snapshot from the last location check. Only the locations and hints that depend on a changed byte are
+        # re-evaluated each tick. `None` forces a full scan.
+        self.last_flag_snapshot: Optional[bytes] = None
+        # Names of all hints whose flags have been set.
+        self.hints_checked: set[str] = set()
+
+        # Location codes (`None` for Defeat Demise) that have neither been checked in-game nor confirmed by the server.
+        # Only these locations are evaluated, so the work per tick shrinks as the seed progresses.
+        self.unresolved_locations: set[Optional[int]] = set(LOCATION_FLAG_CHECKS.id_to_flags)
+        self.unresolved_location_mask: int = LOCATION_FLAG_CHECKS.mask
+        self.unresolved_hint_mask: int = HINT_FLAG_CHECKS.mask
+
+        # Location checks and scouts sent to the server that it hasn't confirmed yet, with the time they were last sent.
+        # They are only sent again after `CHECK_RESEND_TIMEOUT` seconds.
+        self.locations_in_flight: dict[int, float] = {}
+        self.scouts_in_flight: dict[int, float] = {}
+
         # Name of the current stage as read from the game's memory. Sent to trackers whenever its value changes to
         # facilitate automatically switching to the map of the current stage.
         self.current_stage_name: str = ""
@@ -85,9 +151,49 @@ class SSContext(CommonContext):
         # Trackers can request the dictionary from data storage to see which stages the player has visited.
         # It starts as `None` until it has been read from the server.
         self.visited_stage_names: Optional[set[str]] = None
+        # Newly visited stages that haven't been sent to the server yet, and the timer that sends them as one batch.
+        self.unsent_visited_stages: set[str] = set()
+        self.visited_stages_timer: Optional[asyncio.TimerHandle] = None
+
+        # Length of the item get array in memory. Depends on the build of the game, so it is set from the slot data.
+        self.len_give_item_array: int = 0x1
 
-        # Length of the item get array in memory.
-        self.len_give_item_array: int = 0x1 # TODO CHANGE TO 0x10 WHEN GAME IS FIXED
+        # Seconds it took to deliver each of the most recently given items.
+        self.item_delivery_latencies: deque[float] = deque(maxlen=1000)
+
+        # Batches of items waiting to be given by the item delivery task. Only one batch is queued at a time.
+        self.item_delivery_task: Optional[asyncio.Task[None]] = None
+        self.item_delivery_queue: asyncio.Queue[list[tuple[NetworkItem, int]]] = asyncio.Queue(maxsize=1)
+        self.delivering_items: bool = False
+
+        # Timings of each phase of the client, shown by the /perf command.
+        self.perf: SSPerfStats = SSPerfStats()
+
+        # The player's expected index when it was last read.
+        self.last_expected_index: int = 0
+
+        # Messages to the server queued during a tick of the sync loop. They are sent in one frame at the end of the
+        # tick.
+        self.outbox: SSOutbox = SSOutbox(self.perf.record)
+
+        # Runs each part of the Dolphin sync loop at its own rate.
+        self.sync_scheduler: SSSyncScheduler = make_sync_scheduler(self.perf.record)
+
+        # Tracks which locations are in logic, if the connected slot's slot data supports it.
+        self.logic_tracker: Optional[SSLogicTracker] = None
+        # Number of received items, and AP IDs of the checked locations holding this slot's own items, that the logic
+        # tracker has collected.
+        self.logic_items_counted: int = 0
+        self.logic_locations_counted: set[int] = set()
+
+        # Publishes progress to trackers over Bounce when the client is run with `--tracker-feed`.
+        self.tracker_feed: Optional[SSTrackerFeed] = None
+
+        # State of the connected slot that is kept on disk, so a restarted client doesn't have to start from scratch.
+        self.client_state: Optional[SSClientState] = None
+
+        # Records the flags and Link's state each tick when the client is run with `--record-trace`.
+        self.trace_recorder: Optional["SSTraceRecorder"] = None
 
     async def disconnect(self, allow_autoreconnect: bool = False) -> None:
         """
@@ -100,8 +206,92 @@ class SSContext(CommonContext):
         self.salvage_locations_map = {}
         self.current_stage_name = ""
         self.visited_stage_names = None
+        # Send the last batch of visited stages and any queued messages before the connection closes.
+        message = self.take_visited_stages_update()
+        msgs = self.outbox.take()
+        if message is not None:
+            msgs.append(message)
+        if msgs and self.server and not self.server.socket.closed:
+            await self.send_msgs(msgs)
+        self.client_state = None
+        self.logic_tracker = None
         await super().disconnect(allow_autoreconnect)
 
+    def reset_location_checks(self) -> None:
+        """
+        Forget which locations and hints were checked in-game.
+        All locations the server hasn't confirmed are scanned again on the next tick.
+        """
+        self.locations_checked = set()
+        self.last_flag_snapshot = None
+        self.hints_checked = set()
+        self.unresolved_locations = {
+            code
+            for code in LOCATION_FLAG_CHECKS.id_to_flags
+            if (not self.finished_game if code is None else SSLocation.get_apid(code) not in self.checked_locations)
+        }
+        self.unresolved_location_mask = LOCATION_FLAG_CHECKS.mask_of(self.unresolved_locations)
+        self.unresolved_hint_mask = HINT_FLAG_CHECKS.mask
+        self.locations_in_flight = {}
+        self.scouts_in_flight = {}
+
+    def restore_client_state(self) -> None:
+        """
+        Resume from the client state saved on disk for this slot.
+        Locations that were checked in-game but that the server hasn't confirmed are sent again. The last flag snapshot
+        is evaluated once against the unresolved locations and hints, so later ticks only re-check the flags that
+        changed since then.
+        """
+        state = self.client_state
+        if state is None:
+            return
+        self.locations_scouted |= state.scouted_locations
+        self.beedle_items_purchased = [
+            max(purchased, saved) for purchased, saved in zip(self.beedle_items_purchased, state.beedle_items_purchased)
+        ]
+        checked_codes = {apid - SSLocation.get_apid(0) for apid in state.checked_locations}
+        hints_checked = set()
+        snapshot_size = STORYFLAG_BLOCK_SIZE + SCENEFLAG_BLOCK_SIZE
+        if state.flag_snapshot is not None and len(state.flag_snapshot) == snapshot_size:
+            self.last_flag_snapshot = state.flag_snapshot
+            checked_codes |= LOCATION_FLAG_CHECKS.checked(state.flag_snapshot, self.unresolved_location_mask)
+            hints_checked = HINT_FLAG_CHECKS.checked(state.flag_snapshot, self.unresolved_hint_mask)
+        handle_checked_flags(self, checked_codes & self.unresolved_locations, hints_checked)
+
+    def start_logic_tracker(self, slot_data: dict[str, Any]) -> None:
+        """
+        Start tracking which locations are in logic for the connected slot, starting from its starting items.
+        The items this slot found in its own world aren't sent as received items, so the checked locations are scouted
+        to find them. The client carries on without the tracker if it can't be started.
+
+        :param slot_data: The slot data from the `Connected` packet.
+        """
+        self.logic_items_counted = 0
+        self.logic_locations_counted = set()
+        try:
+            self.logic_tracker = SSLogicTracker(self.slot, slot_data)
+            self.logic_tracker.collect(slot_data["precollected_items"])
+        except KeyError:
+            # The seed was generated with a version of the world that doesn't send what the tracker needs.
+            self.logic_tracker = None
+            return
+        except Exception:
+            logger.error(f"Failed to start logic tracking, continuing without it:\n{traceback.format_exc()}")
+            self.logic_tracker = None
+            return
+        scout_checked_locations(self, self.checked_locations)
+        update_logic(self)
+
+    def resolve_locations(self, codes: set[Optional[int]]) -> None:
+        """
+        Stop evaluating the given locations.
+
+        :param codes: Location codes (`None` for Defeat Demise) that were checked in-game or confirmed by the server.
+        """
+        if not self.unresolved_locations.isdisjoint(codes):
+            self.unresolved_locations.difference_update(codes)
+            self.unresolved_location_mask = LOCATION_FLAG_CHECKS.mask_of(self.unresolved_locations)
+
     async def server_auth(self, password_requested: bool = False) -> None:
         """
         Authenticate with the Archipelago server.
@@ -126,25 +316,71 @@ class SSContext(CommonContext):
         :param args: The command arguments.
         """
         if cmd == "Connected":
-            self.items_rcvd = []
-            self.last_rcvd_index = -1
-            self.locations_for_hint = args["slot_data"]["locations_for_hint"]
+            self.items_rcvd.clear()
+            self.hint_location_apids = {
+                hint: frozenset(SSLocation.get_apid(LOCATION_TABLE[locname].code) for locname in locnames)
+                for hint, locnames in args["slot_data"]["locations_for_hint"].items()
+            }
+            self.len_give_item_array = args["slot_data"].get("give_item_array_length", 0x1)
+            self.reset_location_checks()
+            self.client_state = (
+                SSClientState.for_slot(self.seed_name, self.team, self.slot) if self.seed_name is not None else None
+            )
+            self.restore_client_state()
+            update_beedle_purchases(self)
+            self.start_logic_tracker(args["slot_data"])
+            if self.tracker_feed is not None:
+                self.tracker_feed.request_resync()
             if "death_link" in args["slot_data"]:
                 Utils.async_start(
                     self.update_death_link(bool(args["slot_data"]["death_link"]))
                 )
-            # Request the connected slot's dictionary (used as a set) of visited stages.
             visited_stages_key = AP_VISITED_STAGE_NAMES_KEY_FORMAT % self.slot
-            Utils.async_start(
-                self.send_msgs([{"cmd": "Get", "keys": [visited_stages_key]}])
-            )
+            if self.client_state is not None and self.client_state.visited_stages:
+                # The visited stages are known from the last session, so don't request them from the server. Make sure
+                # the server has all of them instead, in case the client closed before sending the last one.
+                self.visited_stage_names = set(self.client_state.visited_stages)
+                self.outbox.queue(
+                    {
+                        "cmd": "Set",
+                        "key": visited_stages_key,
+                        "default": {},
+                        "want_reply": False,
+                        "operations": [
+                            {
+                                "operation": "update",
+                                "value": dict.fromkeys(self.visited_stage_names, True),
+                            }
+                        ],
+                    }
+                )
+            else:
+                # Request the connected slot's dictionary (used as a set) of visited stages.
+                Utils.async_start(
+                    self.send_msgs([{"cmd": "Get", "keys": [visited_stages_key]}])
+                )
         elif cmd == "ReceivedItems":
-            if args["index"] >= self.last_rcvd_index:
-                self.last_rcvd_index = args["index"]
-                for item in args["items"]:
-                    self.items_rcvd.append((item, self.last_rcvd_index))
-                    self.last_rcvd_index += 1
-            self.items_rcvd.sort(key=lambda v: v[1])
+            self.items_rcvd.add(args["index"], args["items"])
+            update_logic(self)
+        elif cmd == "RoomUpdate":
+            if "checked_locations" in args:
+                # Locations confirmed by the server never need to be evaluated or sent again.
+                confirmed = set(args["checked_locations"])
+                for apid in confirmed:
+                    self.locations_in_flight.pop(apid, None)
+                self.resolve_locations({apid - SSLocation.get_apid(0) for apid in confirmed})
+                update_beedle_purchases(self)
+                scout_checked_locations(self, confirmed)
+        elif cmd == "LocationInfo":
+            for apid in list(self.scouts_in_flight):
+                if apid in self.locations_info:
+                    del self.scouts_in_flight[apid]
+            if self.client_state is not None:
+                self.client_state.add_scouted_locations(item.location for item in args["locations"])
+            update_logic(self)
+        elif cmd == "Bounced":
+            if self.tracker_feed is not None and args.get("data", {}).get(TRACKER_FEED_RESYNC_KEY):
+                self.tracker_feed.request_resync()
         elif cmd == "Retrieved":
             requested_keys_dict = args["keys"]
             # Read the connected slot's dictionary (used as a set) of visited stages.
@@ -168,6 +404,11 @@ class SSContext(CommonContext):
                             self.update_visited_stages(current_stage_name)
                         )
                     self.visited_stage_names = visited_stage_names
+                    if self.client_state is not None:
+                        self.client_state.add_visited_stages(visited_stage_names)
+
+        # Send replies to the server right away, whether or not Dolphin is hooked and the player is in-game.
+        self.outbox.flush(self.send_msgs)
 
     def on_deathlink(self, data: dict[str, Any]) -> None:
         """
@@ -176,7 +417,7 @@ class SSContext(CommonContext):
         :param data: The data associated with the DeathLink event.
         """
         super().on_deathlink(data)
-        _give_death(self)
+        Utils.async_start(_give_death(self), name="SSGiveDeath")
 
     def make_gui(self) -> type["kvui.GameManager"]:
         """
@@ -191,27 +432,216 @@ class SSContext(CommonContext):
     async def update_visited_stages(self, newly_visited_stage_name: str) -> None:
         """
         Update the server's data storage of the visited stage names to include the newly visited stage name.
+        Stages visited in quick succession are sent together as one update, `VISITED_STAGES_FLUSH_DELAY` seconds after
+        the first of them. Each stage is saved to the client state right away, so a batch that was never sent because
+        the client crashed is sent when it next connects to the slot.
 
         :param newly_visited_stage_name: The name of the stage recently visited.
         """
         if self.slot is not None:
-            visited_stages_key = AP_VISITED_STAGE_NAMES_KEY_FORMAT % self.slot
-            await self.send_msgs(
-                [
-                    {
-                        "cmd": "Set",
-                        "key": visited_stages_key,
-                        "default": {},
-                        "want_reply": False,
-                        "operations": [
-                            {
-                                "operation": "update",
-                                "value": {newly_visited_stage_name: True},
-                            }
-                        ],
-                    }
-                ]
-            )
+            if self.client_state is not None:
+                self.client_state.add_visited_stages([newly_visited_stage_name])
+            self.unsent_visited_stages.add(newly_visited_stage_name)
+            if self.visited_stages_timer is None:
+                self.visited_stages_timer = asyncio.get_running_loop().call_later(
+                    VISITED_STAGES_FLUSH_DELAY, self.flush_visited_stages
+                )
+
+    def flush_visited_stages(self) -> None:
+        """
+        Send the batch of newly visited stages to the server.
+        """
+        message = self.take_visited_stages_update()
+        if message is not None:
+            Utils.async_start(self.send_msgs([message]), name="SSVisitedStages")
+
+    def take_visited_stages_update(self) -> Optional[dict[str, Any]]:
+        """
+        Take the batch of newly visited stages, and stop the timer that would have sent it.
+
+        :return: The `Set` message that adds the stages to the server's data storage, or `None` if there are none.
+        """
+        if self.visited_stages_timer is not None:
+            self.visited_stages_timer.cancel()
+            self.visited_stages_timer = None
+        stages, self.unsent_visited_stages = self.unsent_visited_stages, set()
+        if not stages or self.slot is None:
+            return None
+        visited_stages_key = AP_VISITED_STAGE_NAMES_KEY_FORMAT % self.slot
+        return {
+            "cmd": "Set",
+            "key": visited_stages_key,
+            "default": {},
+            "want_reply": False,
+            "operations": [
+                {
+                    "operation": "update",
+                    "value": dict.fromkeys(sorted(stages), True),
+                }
+            ],
+        }
+
+
+# Module used to access Dolphin's memory. On Linux, `use_shared_memory` can replace dolphin_memory_engine with a direct
+# mapping of Dolphin's emulated RAM, and `use_memory_backend` can replace it with a fake Dolphin for testing.
+dme_backend: Any = dolphin_memory_engine
+
+# All calls into Dolphin's memory run on the worker's thread, off the event loop.
+dme_worker = SSMemoryWorker()
+
+# Reads from Dolphin memory are cached for one tick of the sync loop.
+dme_cache = SSReadCache(
+    lambda console_address, size: dme_worker.read_bytes(dme_backend.read_bytes, console_address, size)
+)
+
+
+def use_memory_backend(backend: Any) -> None:
+    """
+    Access Dolphin's memory through another backend with the same functions as dolphin_memory_engine, e.g.
+    `SSSharedMemory` or `SSFakeDolphin`.
+
+    :param backend: The backend.
+    """
+    global dme_backend
+    dme_backend = backend
+    dme_cache.invalidate()
+
+
+def use_shared_memory(path: Optional[str] = None) -> None:
+    """
+    Access Dolphin's memory by mapping its shared memory object instead of through dolphin_memory_engine.
+    Only available on Linux.
+
+    :param path: Path of the shared memory object. Defaults to the most recently created Dolphin object in `/dev/shm`.
+    """
+    use_memory_backend(SSSharedMemory(path))
+
+
+def dme_direct() -> bool:
+    """
+    Check whether Dolphin's memory is mapped into this process (see `SSSharedMemory`).
+    Mapped memory is read and written directly, without the worker thread or the read cache.
+
+    :return: `True` if the memory is mapped, otherwise `False`.
+    """
+    return isinstance(dme_backend, SSSharedMemory)
+
+
+def dme_read_counts() -> tuple[int, int]:
+    """
+    Count the reads from Dolphin memory so far, whether they went through the worker thread or read mapped memory.
+
+    :return: The number of reads and the number of bytes they read.
+    """
+    reads, bytes_read = dme_worker.reads, dme_worker.bytes_read
+    if dme_direct():
+        reads += dme_backend.reads
+        bytes_read += dme_backend.bytes_read
+    return reads, bytes_read
+
+
+async def dme_sleep(seconds: float) -> None:
+    """
+    Wait before reading from Dolphin memory again.
+    This ends the current tick, so later reads see fresh values.
+
+    :param seconds: Seconds to wait.
+    """
+    dme_cache.invalidate()
+    await asyncio.sleep(seconds)
+    dme_cache.invalidate()
+
+
+async def dme_hook() -> bool:
+    """
+    Try to hook into Dolphin without blocking the event loop, since finding the Dolphin process can take a while.
+
+    :return: `True` if Dolphin is hooked, otherwise `False`.
+    """
+    await dme_worker.run(dme_backend.hook)
+    dme_cache.invalidate()
+    return dme_backend.is_hooked()
+
+
+async def dme_prefetch(ctx: SSContext, flags: bool = False) -> None:
+    """
+    Read everything a tick needs from Dolphin memory in one batch on the worker thread.
+    Fields that are close together in memory are read as one range (see `SSReadPlan`).
+    The synchronous `dme_read_*` helpers then read from the cache instead of waiting on Dolphin.
+
+    :param ctx: The SS client context.
+    :param flags: Also read the flag snapshot for location checks.
+    """
+    if dme_direct() or not dme_backend.is_hooked():
+        return
+    # Read the slot name until it is known, and everything the trace recorder reads while recording.
+    extra_fields = () if ctx.slot is not None else (MEMORY_MAP["slot_name"],)
+    if ctx.trace_recorder is not None:
+        extra_fields += tuple(ctx.trace_recorder.fields)
+    await _dme_read_plan(make_tick_read_plan(ctx.len_give_item_array, flags, extra_fields))
+
+
+async def dme_prefetch_fields(*names: str) -> None:
+    """
+    Read fields of the memory map in one batch on the worker thread, so reading them afterwards doesn't block.
+
+    :param names: Names of the fields (see `MEMORY_MAP`).
+    """
+    if dme_direct() or not dme_backend.is_hooked():
+        return
+    await _dme_read_plan(SSReadPlan(MEMORY_MAP[name] for name in names))
+
+
+async def _dme_read_plan(plan: SSReadPlan) -> None:
+    """
+    Perform a read plan on the worker thread, and cache the ranges and the fields decoded from them.
+
+    :param plan: The read plan.
+    """
+    ranges = await dme_worker.read_ranges(dme_backend.read_bytes, plan.ranges)
+    dme_cache.store(ranges, plan.decode(ranges))
+
+
+def dme_read_bytes(console_address: int, size: int) -> bytes:
+    """
+    Read bytes from Dolphin memory.
+
+    :param console_address: Address to start reading from.
+    :param size: Number of bytes to read.
+    :return: The bytes read from memory.
+    """
+    if dme_direct():
+        return dme_backend.read_bytes(console_address, size)
+    return dme_cache.read_bytes(console_address, size)
+
+
+def dme_read_view(console_address: int, size: int) -> Union[bytes, memoryview]:
+    """
+    Read bytes from Dolphin memory without copying them if the memory is mapped.
+    A view of mapped memory sees later changes, so only use the result before the next `await`, e.g. to join it with
+    other reads.
+
+    :param console_address: Address to start reading from.
+    :param size: Number of bytes to read.
+    :return: The bytes read from memory, or a view of them.
+    """
+    if dme_direct():
+        return dme_backend.view(console_address, size)
+    return dme_cache.read_bytes(console_address, size)
+
+
+def dme_read_field(name: str) -> Any:
+    """
+    Read a field of the memory map (see `MEMORY_MAP`), decoded according to its type.
+    Fields that were prefetched this tick were already decoded by the tick's read plan.
+
+    :param name: Name of the field.
+    :return: The value of the field.
+    """
+    if name in dme_cache.fields:
+        return dme_cache.fields[name]
+    field = MEMORY_MAP[name]
+    return field.decode(dme_read_view(field.address, field.size))
 
 
 def dme_read_byte(console_address: int) -> int:
@@ -221,7 +651,19 @@ def dme_read_byte(console_address: int) -> int:
     :param console_address: Address to read from.
     :return: The value read from memory.
     """
-    return dolphin_memory_engine.read_byte(console_address)
+    if dme_direct():
+        return dme_backend.read_byte(console_address)
+    return dme_read_bytes(console_address, 1)[0]
+
+
+def _log_write_error(future: "Future[None]") -> None:
+    """
+    Log the error of a write to Dolphin memory, since nothing waits for the write to finish.
+
+    :param future: The finished write.
+    """
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Failed to write to Dolphin memory: {future.exception()}")
 
 
 def dme_write_byte(console_address: int, value: bytes) -> None:
@@ -231,7 +673,11 @@ def dme_write_byte(console_address: int, value: bytes) -> None:
     :param console_address: Address to write to.
     :param value: Value to write.
     """
-    dolphin_memory_engine.write_byte(console_address, value)
+    if dme_direct():
+        dme_backend.write_byte(console_address, value)
+        return
+    dme_cache.invalidate()
+    dme_worker.submit(dme_backend.write_byte, console_address, value).add_done_callback(_log_write_error)
 
 
 def dme_read_short(console_address: int) -> int:
@@ -241,8 +687,10 @@ def dme_read_short(console_address: int) -> int:
     :param console_address: Address to read from.
     :return: The value read from memory.
     """
+    if dme_direct():
+        return dme_backend.unpack("H", console_address)[0]
     return int.from_bytes(
-        dolphin_memory_engine.read_bytes(console_address, 2), byteorder="big"
+        dme_read_bytes(console_address, 2), byteorder="big"
     )
 
 
@@ -253,9 +701,13 @@ def dme_write_short(console_address: int, value: int) -> None:
     :param console_address: Address to write to.
     :param value: Value to write.
     """
-    dolphin_memory_engine.write_bytes(
-        console_address, value.to_bytes(2, byteorder="big")
-    )
+    if dme_direct():
+        dme_backend.write_bytes(console_address, value.to_bytes(2, byteorder="big"))
+        return
+    dme_cache.invalidate()
+    dme_worker.submit(
+        dme_backend.write_bytes, console_address, value.to_bytes(2, byteorder="big")
+    ).add_done_callback(_log_write_error)
 
 
 def dme_read_string(console_address: int, strlen: int) -> str:
@@ -267,7 +719,7 @@ def dme_read_string(console_address: int, strlen: int) -> str:
     :return: The string.
     """
     return (
-        dolphin_memory_engine.read_bytes(console_address, strlen)
+        dme_read_bytes(console_address, strlen)
         .split(b"\0", 1)[0]
         .decode()
     )
@@ -280,175 +732,390 @@ def dme_read_slot() -> str:
 
     :return: The string containing the slot name.
     """
-    slot_bytes = dolphin_memory_engine.read_bytes(ARCHIPELAGO_ARRAY_ADDR + 0x14, 0x10)
-    slot_bytes = slot_bytes.replace(b"\xFF", b"")
+    slot_bytes = dme_read_field("slot_name")
+    slot_bytes = slot_bytes.replace(b"\xFF", b"").rstrip(b"\0")
 
     return slot_bytes.decode("utf-8")
 
 
+def dme_read_flag_snapshot() -> bytes:
+    """
+    Read all storyflags and saved sceneflags from Dolphin memory.
+    The snapshot is the storyflag block followed by the sceneflag block.
+    Use `get_flag_offset` from `Client.Flags` to find a flag's byte in the snapshot.
+
+    :return: The flag snapshot.
+    """
+    return dme_read_field("storyflags") + dme_read_field("sceneflags")
+
 
-def _give_death(ctx: SSContext) -> None:
+async def _give_death(ctx: SSContext) -> None:
     """
     Trigger the player's death in-game by setting their current health to zero.
+    Link's state is prefetched first, so checking whether the player is in-game doesn't block the event loop.
 
     :param ctx: The SS client context.
     """
     if (
-        ctx.slot is not None
-        and dolphin_memory_engine.is_hooked()
-        and ctx.dolphin_status == CONNECTION_CONNECTED_STATUS
-        and check_ingame()
+        ctx.slot is None
+        or not dme_backend.is_hooked()
+        or ctx.dolphin_status != CONNECTION_CONNECTED_STATUS
     ):
-        ctx.has_send_death = True
-        dme_write_short(CURR_HEALTH_ADDR, 0)
+        return
+    try:
+        await dme_prefetch(ctx)
+        if check_ingame():
+            ctx.has_send_death = True
+            dme_write_short(CURR_HEALTH_ADDR, 0)
+    except Exception:
+        logger.error(traceback.format_exc())
 
 
-async def _give_item(ctx: SSContext, item_name: str) -> bool:
+async def _give_items(ctx: SSContext, items: list[tuple[NetworkItem, int]]) -> int:
     """
-    Give an item to the player in-game.
+    Give a batch of items to the player in-game, placing each item in a free slot of the item array.
+    Instead of waiting a fixed time, poll the game's memory until it has taken the items.
+    The delivery latency of each item is recorded once the game has emptied the slots it was placed in.
 
     :param ctx: The SS client context.
-    :param item_name: Name of the item to give.
-    :return: Whether the item was successfully given.
+    :param items: The next items to give, in order, with their indices.
+    :return: How many items from the start of the batch were given.
     """
+    start_time = time.perf_counter()
     if not can_receive_items(ctx):
-        return False
-
-    item_id = ITEM_TABLE[item_name].item_id  # In game item ID
-
-    # Loop through the item array, placing the item in an empty slot (0xFF).
-    for idx in range(ctx.len_give_item_array):
-        slot = dme_read_byte(ARCHIPELAGO_ARRAY_ADDR + idx)
-        if slot == 0xFF:
-            await asyncio.sleep(0.25)
-            logger.info(f"DEBUG: Gave item {item_id} to player {ctx.player_names[ctx.slot]}.")
-            dme_write_byte(ARCHIPELAGO_ARRAY_ADDR + idx, item_id)
-            await asyncio.sleep(0.25)
-            # If this happens, this may be an indicator that the player interrupted the itemget with something like a Fi call
-            # or bed which could delete the item, so we should check for a reload
-            while get_link_action(check_in_ffw(ctx)) != ITEM_GET_ACTION:
-                await asyncio.sleep(0.1)
-                # Stop trying if the player soft reset
-                # Also stop trying if the player is using a door, since doors don't actually delete items
-                # And, while the client won't initiate an item send while the player is swimming, the player
-                # can still receive items when going through underwater loading zones, as their action will
-                # momentarily be action 0x03.
-                # The patched game *will* still give them the item, but it won't give them the item action,
-                # so we shouldn't resend the item, or else it will be duplicated.
-                if check_on_title_screen() or get_link_action(check_in_ffw(ctx)) in DOOR_ACTIONS + SWIM_ACTIONS:
-                    break
-                    
-                # If state is 0, that means a reload occurred, so we should resend the item.
-                # However, we shouldn't resend the item if the user immediately enters the item get action anyway
-                # (which can happen if this reload occurs due to a door, in which case the original item will still be received)
-                if not check_ingame(check_in_ffw(ctx)):
-                    logger.info(f"DEBUG: A reload deleted the item. Resending the item...")
-                    return False
-            
-            return True
-
-    # If unable to place the item in the array, return False.
-    return False
+        return 0
+
+    # Find the empty slots (0xFF) in the item array. Only give as many items as there are empty slots.
+    give_item_array = dme_read_field("give_item_array")[: ctx.len_give_item_array]
+    free_slots = [idx for idx, slot in enumerate(give_item_array) if slot == 0xFF]
+    items = items[: len(free_slots)]
+    if not items:
+        # If unable to place any item in the array, return 0.
+        return 0
+
+    # Make sure Link is still able to receive items a frame later, so he isn't about to go through a loading zone.
+    await dme_sleep(ITEM_POLL_MIN_DELAY)
+    await dme_prefetch(ctx)
+    if not can_receive_items(ctx):
+        return 0
+
+    used_slots = free_slots[: len(items)]
+    for slot, (item, _) in zip(used_slots, items):
+        item_id = ITEM_TABLE[LOOKUP_ID_TO_NAME[item.item]].item_id  # In game item ID
+        logger.info(f"DEBUG: Gave item {item_id} to player {ctx.player_names[ctx.slot]}.")
+        dme_write_byte(ARCHIPELAGO_ARRAY_ADDR + slot, item_id)
+
+    # Wait until the game has taken every item out of the array (setting its slot back to 0xFF) and Link is getting an
+    # item.
+    # If this takes a while, this may be an indicator that the player interrupted the itemget with something like a Fi
+    # call or bed which could delete the item, so we should check for a reload
+    delay = ITEM_POLL_MIN_DELAY
+    while True:
+        await dme_sleep(delay)
+        await dme_prefetch(ctx)
+        delay = min(delay * 2, ITEM_POLL_MAX_DELAY)
+
+        give_item_array = dme_read_field("give_item_array")[: ctx.len_give_item_array]
+        link_action = get_link_action(check_in_ffw(ctx))
+        if link_action == ITEM_GET_ACTION and all(give_item_array[slot] == 0xFF for slot in used_slots):
+            latency = time.perf_counter() - start_time
+            ctx.item_delivery_latencies.extend([latency] * len(items))
+            logger.debug(f"Delivered {len(items)} item(s) in {latency * 1000:.0f} ms.")
+            break
+
+        # Stop trying if the player soft reset
+        # Also stop trying if the player is using a door, since doors don't actually delete items
+        # And, while the client won't initiate an item send while the player is swimming, the player
+        # can still receive items when going through underwater loading zones, as their action will
+        # momentarily be action 0x03.
+        # The patched game *will* still give them the item, but it won't give them the item action,
+        # so we shouldn't resend the item, or else it will be duplicated.
+        if check_on_title_screen() or link_action in DOOR_ACTIONS + SWIM_ACTIONS:
+            break
+
+        # Stop waiting if the client is closing, so shutdown isn't held up by an item the game never takes.
+        if ctx.exit_event.is_set():
+            return 0
+
+        # If state is 0, that means a reload occurred, so we should resend the items.
+        # However, we shouldn't resend the items if the user immediately enters the item get action anyway
+        # (which can happen if this reload occurs due to a door, in which case the original items will still be received)
+        if not check_ingame(check_in_ffw(ctx)):
+            logger.info("DEBUG: A reload deleted the items. Resending the items...")
+            return 0
+
+    return len(items)
 
 
 async def give_items(ctx: SSContext) -> None:
     """
-    Give the player all outstanding items they have yet to receive.
+    Queue the next batch of items the player has yet to receive for the item delivery task.
+    Up to one item per slot of the item array is given at a time.
 
     :param ctx: The SS client context.
     """
+    # Only queue a batch once the previous one has been delivered, since it moves the expected index.
+    if ctx.delivering_items or not ctx.item_delivery_queue.empty():
+        return
+
     if can_receive_items(ctx):
-        # Read the expected index of the player, which is the index of the latest item they've received.
-        expected_idx = dme_read_short(EXPECTED_INDEX_ADDR)
+        # Read the expected index of the player, which is the index of the next item they should receive.
+        # It is saved with the player's file, so a reload rolls it back along with the items that were lost.
+        expected_idx = dme_read_field("expected_index")
+        ctx.last_expected_index = expected_idx
+
+        # The items whose index is at least the player's expected index haven't been received yet.
+        items = ctx.items_rcvd.pending(expected_idx, ctx.len_give_item_array)
+        if items:
+            ctx.item_delivery_queue.put_nowait(items)
+
 
-        # Loop through items to give.
-        for item, idx in ctx.items_rcvd:
-            # If the item's index is greater than the player's expected index, give the player the item.
-            if expected_idx <= idx:
-                # Attempt to give the item and increment the expected index.
-                while not await _give_item(ctx, LOOKUP_ID_TO_NAME[item.item]):
-                    await asyncio.sleep(1)
+async def deliver_items(ctx: SSContext, items: list[tuple[NetworkItem, int]]) -> bool:
+    """
+    Give a queued batch of items to the player and increment the expected index past the items given.
+
+    :param ctx: The SS client context.
+    :param items: The batch of items to give, in order, with their indices.
+    :return: `False` if no item could be given and the batch should be retried later, otherwise `True`.
+    """
+    if not dme_backend.is_hooked() or ctx.dolphin_status != CONNECTION_CONNECTED_STATUS:
+        return False
+    await dme_prefetch(ctx)
+
+    # Drop the batch if the expected index moved since it was queued (e.g. the player reloaded).
+    if dme_read_field("expected_index") != items[0][1]:
+        return True
+
+    given = await _give_items(ctx, items)
+    if not given:
+        return False
 
-                # Increment the expected index.
-                dme_write_short(EXPECTED_INDEX_ADDR, idx + 1)
+    dme_write_short(EXPECTED_INDEX_ADDR, items[given - 1][1] + 1)
+    return True
 
 
-async def check_locations(ctx: SSContext) -> None:
+async def item_delivery_task(ctx: SSContext) -> None:
     """
-    Loops through all locations and checks the sceneflag/storyflag(s) associated with the location in the location table.
+    Deliver the batches of items queued by `give_items`.
+
+    This runs separately from the Dolphin sync loop, so locations, deaths and stages are still checked while the player
+    is in a state where they can't receive items.
+
+    :param ctx: The SS client context.
+    """
+    retry_delay = ITEM_RETRY_MIN_DELAY
+    while not ctx.exit_event.is_set():
+        try:
+            items = await asyncio.wait_for(ctx.item_delivery_queue.get(), 1)
+        except asyncio.TimeoutError:
+            continue
+
+        ctx.delivering_items = True
+        try:
+            with ctx.perf.time("delivery"):
+                delivered = await deliver_items(ctx, items)
+        except Exception:
+            logger.error(traceback.format_exc())
+            delivered = False
+
+        if delivered:
+            retry_delay = ITEM_RETRY_MIN_DELAY
+            ctx.delivering_items = False
+            # Queue the next batch right away rather than waiting for the sync loop, to drain a backlog quickly.
+            try:
+                await dme_prefetch(ctx)
+                await give_items(ctx)
+            except Exception:
+                logger.error(traceback.format_exc())
+        else:
+            # Wait before the next batch is queued, since the player can't receive items right now.
+            await dme_sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, ITEM_RETRY_MAX_DELAY)
+            ctx.delivering_items = False
+
+
+async def check_locations(ctx: SSContext) -> bool:
+    """
+    Checks the sceneflag/storyflag(s) associated with each unresolved location in the location table.
 
     If Hylia's Realm - Defeat Demise is checked, update the server that this player has beaten the game.
-    Otherwise, send the list of checked locations to the server.
+    Otherwise, send the newly-checked locations to the server.
 
     :param ctx: The SS client context.
+    :return: `True` if any flag changed since the last check, otherwise `False`.
     """
+    flags_changed = False
     # Don't send locations from the title screen (BiT)
     if can_send_items():
-        # Loop through all locations to see if each has been checked.
-        for location, data in LOCATION_TABLE.items():
-            checked = False
-            [flag_type, flag_bit, flag_value, addr] = data.checked_flag
-            if flag_type == SSLocCheckedFlag.STORY:
-                flag = dme_read_byte(addr + flag_bit)
-                checked = bool(flag & flag_value)
-            elif flag_type == SSLocCheckedFlag.SCENE:
-                flag = dme_read_byte(STAGE_TO_SCENEFLAG_ADDR[addr] + flag_bit)
-                checked = bool(flag & flag_value)
-            elif flag_type == SSLocCheckedFlag.SPECL:
-                if location == "Upper Skyloft - Ghost/Pipit's Crystals":
-                    flag1 = bool(dme_read_byte(0x805A9B16) & 0x80)  # 5 crystals from Pipit
-                    flag2 = bool(dme_read_byte(0x805A9B16) & 0x04)  # 5 crystals from Ghost
-                    checked = flag1 or flag2
-                if location == "Central Skyloft - Peater/Peatrice's Crystals":
-                    flag1 = bool(
-                        dme_read_byte(0x805A9B1A) & 0x40
-                    )  # 5 crystals from Peatrice
-                    flag2 = bool(dme_read_byte(0x805A9B1D) & 0x02)  # 5 crystals from Peater
-                    checked = flag1 or flag2
-
-            if checked:
-                if data.code is None:  # Defeat Demise
-                    if not ctx.finished_game:
-                        await ctx.send_msgs(
-                            [{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}]
-                        )
-                        ctx.finished_game = True
-                else:
-                    ctx.locations_checked.add(SSLocation.get_apid(data.code))
-                    for slot, checks in enumerate(BEEDLE_CHECKS):
-                        if ctx.beedle_items_purchased[slot] < len(BEEDLE_CHECKS[slot]) - 1:
-                            ctx.beedle_items_purchased[slot] += (data.code == checks[ctx.beedle_items_purchased[slot]])
-                            
-        
-        hints_checked = set()
-        for hint, data in HINT_TABLE.items():
-            [flag_bit, flag_value, addr] = data.checked_flag
-            # All hint flags are story flags
-            flag = dme_read_byte(addr + flag_bit)
-            checked = bool(flag & flag_value)
+        # Read all the flags at once. Only re-check the locations and hints whose flags changed since the last tick.
+        flags = dme_read_flag_snapshot()
+        last_flags = ctx.last_flag_snapshot
+        ctx.last_flag_snapshot = flags
+
+        if flags != last_flags:
+            flags_changed = True
+            checked_codes = LOCATION_FLAG_CHECKS.checked_since(last_flags, flags, ctx.unresolved_location_mask)
+            hints_checked = HINT_FLAG_CHECKS.checked_since(last_flags, flags, ctx.unresolved_hint_mask)
+            checked_apids = handle_checked_flags(ctx, checked_codes, hints_checked)
+            if checked_apids and ctx.client_state is not None:
+                ctx.client_state.add_checked_locations(checked_apids, flags)
+
+    await send_checks_in_flight(ctx)
+    return flags_changed
+
+
+def handle_checked_flags(ctx: SSContext, checked_codes: set[Optional[int]], hints_checked: set[str]) -> set[int]:
+    """
+    Mark newly checked locations and hints to be sent to the server.
+
+    :param ctx: The SS client context.
+    :param checked_codes: Codes of the newly checked locations (`None` for Defeat Demise).
+    :param hints_checked: Names of the newly checked hints.
+    :return: AP IDs of the newly checked locations.
+    """
+    ctx.resolve_locations(checked_codes)
+
+    if None in checked_codes:  # Defeat Demise
+        checked_codes = checked_codes - {None}
+        if not ctx.finished_game:
+            ctx.outbox.queue({"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL})
+            ctx.finished_game = True
+
+    checked_apids = {SSLocation.get_apid(code) for code in checked_codes}
+    for apid in checked_apids:
+        ctx.locations_checked.add(apid)
+        # Locations that aren't part of this seed are never sent.
+        if apid in ctx.missing_locations:
+            ctx.locations_in_flight[apid] = 0.0
+    if checked_apids:
+        update_beedle_purchases(ctx)
+
+    if hints_checked:
+        ctx.hints_checked.update(hints_checked)
+        ctx.unresolved_hint_mask = HINT_FLAG_CHECKS.mask_of(HINT_TABLE.keys() - ctx.hints_checked)
+        # Each hint is only checked once, when its flag is first set, since it is dropped from the unresolved mask.
+        for hint in hints_checked:
+            apids = ctx.hint_location_apids.get(hint, frozenset())
+            for apid in apids - ctx.locations_scouted - ctx.locations_info.keys():
+                ctx.scouts_in_flight.setdefault(apid, 0.0)
+    return checked_apids
+
+
+async def send_checks_in_flight(ctx: SSContext) -> None:
+    """
+    Queue the location checks & scouts that are new or that the server hasn't confirmed in time.
+
+    :param ctx: The SS client context.
+    """
+    now = time.time()
+    locations_checked = {
+        apid for apid, sent in ctx.locations_in_flight.items() if now - sent >= CHECK_RESEND_TIMEOUT
+    }
+    hints_checked = {
+        apid for apid, sent in ctx.scouts_in_flight.items() if now - sent >= CHECK_RESEND_TIMEOUT
+    }
+    if locations_checked:
+        ctx.locations_in_flight.update(dict.fromkeys(locations_checked, now))
+        ctx.outbox.queue({"cmd": "LocationChecks", "locations": locations_checked})
+    if hints_checked:
+        ctx.scouts_in_flight.update(dict.fromkeys(hints_checked, now))
+        ctx.outbox.queue({"cmd": "LocationScouts", "locations": hints_checked, "create_as_hint": 2})
+
+
+def scout_checked_locations(ctx: SSContext, apids: Iterable[int]) -> None:
+    """
+    Queue a scout of checked locations whose items aren't known yet, so the logic tracker can collect this slot's own
+    items from them. These scouts don't create hints.
+
+    :param ctx: The SS client context.
+    :param apids: AP IDs of the checked locations.
+    """
+    if ctx.logic_tracker is None:
+        return
+    unknown = {apid for apid in apids if apid not in ctx.locations_info}
+    if unknown:
+        ctx.outbox.queue({"cmd": "LocationScouts", "locations": unknown, "create_as_hint": 0})
+
+
+def update_logic(ctx: SSContext) -> None:
+    """
+    Collect the newly received items, and this slot's own items at newly scouted checked locations, in the logic
+    tracker. Only the rules that depend on those items are evaluated again. If that fails, logic tracking stops.
 
-            if checked:
-                for locname in ctx.locations_for_hint.get(hint, []):
-                    hints_checked.add(SSLocation.get_apid(LOCATION_TABLE[locname].code))
+    :param ctx: The SS client context.
+    """
+    tracker = ctx.logic_tracker
+    if tracker is None:
+        return
+    try:
+        items = []
+        item = ctx.items_rcvd.get(ctx.logic_items_counted)
+        while item is not None:
+            items.append(LOOKUP_ID_TO_NAME[item.item])
+            ctx.logic_items_counted += 1
+            item = ctx.items_rcvd.get(ctx.logic_items_counted)
+        for apid in ctx.checked_locations - ctx.logic_locations_counted:
+            location_info = ctx.locations_info.get(apid)
+            if location_info is not None:
+                ctx.logic_locations_counted.add(apid)
+                if location_info.player == ctx.slot:
+                    items.append(LOOKUP_ID_TO_NAME[location_info.item])
+        new_locations = tracker.collect(items)
+    except Exception:
+        logger.error(f"Logic tracking failed and was stopped:\n{traceback.format_exc()}")
+        ctx.logic_tracker = None
+        return
+    if new_locations:
+        logger.info(f"{len(locations_in_logic(ctx))} unchecked location(s) in logic. Use /logic to list them.")
+
+
+def locations_in_logic(ctx: SSContext) -> list[str]:
+    """
+    :param ctx: The SS client context.
+    :return: Names of the locations in logic that haven't been checked, in the order of the location table.
+    """
+    tracker = ctx.logic_tracker
+    if tracker is None:
+        return []
+    return [
+        name
+        for name, data in LOCATION_TABLE.items()
+        if name in tracker.in_logic
+        and data.code is not None
+        and SSLocation.get_apid(data.code) in ctx.missing_locations
+        and SSLocation.get_apid(data.code) not in ctx.locations_checked
+    ]
+
+
+def update_beedle_purchases(ctx: SSContext) -> None:
+    """
+    Count how many items have been bought from each of Beedle's shop slots.
+    Items in a slot are bought in order, so this is the number of leading checks in the slot that have been checked.
 
-        # Send the list of newly-checked locations & hints to the server.
-        locations_checked = ctx.locations_checked.difference(ctx.checked_locations)
-        hints_checked = hints_checked.difference(ctx.locations_scouted)
-        if locations_checked:
-            await ctx.send_msgs([{"cmd": "LocationChecks", "locations": locations_checked}]) 
-        if hints_checked:
-            await ctx.send_msgs([{"cmd": "LocationScouts", "locations": hints_checked, "create_as_hint": 2}]) 
+    :param ctx: The SS client context.
+    """
+    for slot, checks in enumerate(BEEDLE_CHECKS):
+        purchased = ctx.beedle_items_purchased[slot]
+        while purchased < len(checks) - 1 and (
+            SSLocation.get_apid(checks[purchased]) in ctx.locations_checked
+            or SSLocation.get_apid(checks[purchased]) in ctx.checked_locations
+        ):
+            purchased += 1
+        ctx.beedle_items_purchased[slot] = purchased
+    if ctx.client_state is not None:
+        ctx.client_state.set_beedle_items_purchased(ctx.beedle_items_purchased)
 
 
-async def check_current_stage_changed(ctx: SSContext) -> None:
+async def check_current_stage_changed(ctx: SSContext) -> bool:
     """
     Check if the player has moved to a new stage.
     If so, update all trackers with the new stage name.
     If the stage has never been visited, additionally update the server.
 
     :param ctx: The SS client context.
+    :return: `True` if the stage changed, otherwise `False`.
     """
-    new_stage_name = dme_read_string(CURR_STAGE_ADDR, 16)
+    new_stage_name = dme_read_field("stage")
 
     current_stage_name = ctx.current_stage_name
 
@@ -463,7 +1130,7 @@ async def check_current_stage_changed(ctx: SSContext) -> None:
             "slots": [ctx.slot],
             "data": data_to_send,
         }
-        await ctx.send_msgs([message])
+        ctx.outbox.queue(message)
 
         # If the stage has never been visited before, update the server's data storage to indicate that it has been
         # visited.
@@ -474,6 +1141,8 @@ async def check_current_stage_changed(ctx: SSContext) -> None:
         ):
             visited_stage_names.add(new_stage_name)
             await ctx.update_visited_stages(new_stage_name)
+        return True
+    return False
 
 async def scout_beedle_checks(ctx: SSContext) -> None:
     locs_to_scout = set()
@@ -481,7 +1150,7 @@ async def scout_beedle_checks(ctx: SSContext) -> None:
         if len(BEEDLE_CHECKS[slot]) > purchased_idx:
             locs_to_scout.add(SSLocation.get_apid(BEEDLE_CHECKS[slot][purchased_idx]))
     
-    await ctx.send_msgs([{"cmd": "LocationScouts", "locations": locs_to_scout, "create_as_hint": 2}]) 
+    ctx.outbox.queue({"cmd": "LocationScouts", "locations": locs_to_scout, "create_as_hint": 2})
 
 def check_alive() -> bool:
     """
@@ -489,7 +1158,7 @@ def check_alive() -> bool:
 
     :return: `True` if the player is alive, otherwise `False`.
     """
-    cur_health = dme_read_short(CURR_HEALTH_ADDR)
+    cur_health = dme_read_field("health")
     return cur_health > 0
 
 
@@ -501,7 +1170,7 @@ async def check_death(ctx: SSContext) -> None:
     :return: `True` if the player is dead, otherwise `False`.
     """
     if ctx.slot is not None and check_ingame() and not check_on_title_screen():
-        cur_health = dme_read_short(CURR_HEALTH_ADDR)
+        cur_health = dme_read_field("health")
         if cur_health <= 0:
             if not ctx.has_send_death and time.time() >= ctx.last_death_link + 3:
                 ctx.has_send_death = True
@@ -511,9 +1180,11 @@ async def check_death(ctx: SSContext) -> None:
 
 def check_in_ffw(ctx: SSContext) -> bool:
     """
-    Check if the player is in Flooded Faron Woods (as this offsets certain memory addresses)
+    Check if the player is in Flooded Faron Woods (as this offsets certain memory addresses).
+    The stage is read from memory, where every tick's prefetch covers it, rather than taken from
+    `ctx.current_stage_name`, which only changes as often as the stage job runs.
     """
-    return "F103" in ctx.current_stage_name
+    return "F103" in dme_read_field("stage")
 
 def check_ingame(in_ffw: bool = False) -> bool:
     """
@@ -529,7 +1200,7 @@ def check_on_title_screen() -> bool:
     
     :return: `True` if the player is on the title screen, otherwise `False`.
     """
-    return dme_read_byte(GLOBAL_TITLE_LOADER_ADDR) != 0x0
+    return dme_read_field("title_loader") != 0x0
 
 def check_in_minigame(in_ffw: bool = False) -> bool:
     """
@@ -538,13 +1209,13 @@ def check_in_minigame(in_ffw: bool = False) -> bool:
     :return: `True` if the player is in a minigame, false if not.
     """
     # Can't be playing minigames while in FFW so just return false in case the address is different
-    return not in_ffw and dme_read_byte(MINIGAME_STATE_ADDR) == 0x0
+    return not in_ffw and dme_read_field("minigame_state") == 0x0
 
 def get_link_state(in_ffw: bool = False) -> bytes:
-    return dolphin_memory_engine.read_bytes(CURR_STATE_ADDR - (FFW_MEMORY_OFFSET if in_ffw else 0), 3)
+    return dme_read_field("link_state_ffw" if in_ffw else "link_state")
 
 def get_link_action(in_ffw: bool = False) -> int:
-    return dme_read_byte(LINK_ACTION_ADDR - (FFW_MEMORY_OFFSET if in_ffw else 0))
+    return dme_read_field("link_action_ffw" if in_ffw else "link_action")
 
 def validate_link_state(in_ffw: bool = False) -> bool:
     """
@@ -563,7 +1234,7 @@ def validate_link_action(in_ffw: bool = False) -> bool:
 
     :return: True if Link is in a safe action, False if Link is not in a safe action.
     """
-    action = dme_read_byte(LINK_ACTION_ADDR - (FFW_MEMORY_OFFSET if in_ffw else 0))
+    action = get_link_action(in_ffw)
     return action <= MAX_SAFE_ACTION or (action == ITEM_GET_ACTION)
 
 def check_on_file_1() -> bool:
@@ -572,7 +1243,7 @@ def check_on_file_1() -> bool:
 
     :return: True if File 1 last selected, False otherwise
     """
-    file = dme_read_byte(SELECTED_FILE_ADDR)
+    file = dme_read_field("selected_file")
     return file == 0
 
 def can_receive_items(ctx: SSContext) -> bool:
@@ -588,94 +1259,260 @@ def can_send_items() -> bool:
     """
     return (not check_on_title_screen()) and check_on_file_1()
 
+def make_sync_scheduler(record: Optional[Callable[[str, float], None]] = None) -> SSSyncScheduler:
+    """
+    Create the scheduler for the Dolphin sync loop.
+    Deaths are detected quickly, while location and stage checks slow down when nothing is happening.
+
+    :param record: Optional function called with the name of each job run and how many seconds it took.
+    :return: The sync scheduler.
+    """
+    return SSSyncScheduler(
+        [
+            SSSyncJob("death", check_death, 0.05, 0, enabled=lambda ctx: "DeathLink" in ctx.tags),
+            SSSyncJob("items", give_items, 0.1, 1),
+            SSSyncJob("locations", check_locations, 0.1, 2, idle_interval=0.5),
+            SSSyncJob("stage", check_current_stage_changed, 0.2, 3, idle_interval=1.0),
+        ],
+        record=record,
+    )
+
+
+def perf_summary(ctx: SSContext) -> dict[str, Any]:
+    """
+    Summarize the client's performance: timings of each phase, memory reads per tick and the depth of each queue.
+    The reads per tick only count the reads of the ticks themselves, while `reads` and `bytes_read` also include
+    paused ticks and item delivery.
+
+    :param ctx: The SS client context.
+    :return: The summary.
+    """
+    ticks = ctx.perf.ticks
+    reads, bytes_read = dme_read_counts()
+    return {
+        "time": time.time(),
+        "uptime": time.monotonic() - ctx.perf.start_time,
+        "phases": ctx.perf.summary(),
+        "ticks": ticks,
+        "reads": reads,
+        "bytes_read": bytes_read,
+        "reads_per_tick": ctx.perf.tick_reads / ticks if ticks else 0.0,
+        "bytes_per_tick": ctx.perf.tick_bytes_read / ticks if ticks else 0.0,
+        "cache_hits": dme_cache.hits,
+        "pending_items": ctx.items_rcvd.pending_count(ctx.last_expected_index),
+        "unsent_checks": len(ctx.locations_in_flight),
+        "unsent_scouts": len(ctx.scouts_in_flight),
+        "queued_messages": len(ctx.outbox),
+        "tracker_feed_updates": ctx.tracker_feed.updates_sent if ctx.tracker_feed is not None else 0,
+    }
+
+
+async def perf_log_task(ctx: SSContext, path: str) -> None:
+    """
+    Periodically append the client's performance summary to a JSON lines file.
+
+    :param ctx: The SS client context.
+    :param path: Path of the file.
+    """
+    while not ctx.exit_event.is_set():
+        try:
+            await asyncio.wait_for(ctx.exit_event.wait(), PERF_LOG_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            with open(path, "a", encoding="utf-8") as perf_log:
+                perf_log.write(json.dumps(perf_summary(ctx)) + "\n")
+        except OSError:
+            logger.error(traceback.format_exc())
+
+
+async def tracker_feed_task(ctx: SSContext, rate: float) -> None:
+    """
+    Publish the player's progress to trackers connected to the slot, at most `rate` times per second.
+    Only what changed since the last update is sent (see `SSTrackerFeed`).
+
+    :param ctx: The SS client context.
+    :param rate: Most updates to send per second.
+    """
+    while not ctx.exit_event.is_set():
+        try:
+            await asyncio.wait_for(ctx.exit_event.wait(), 1 / rate)
+        except asyncio.TimeoutError:
+            pass
+        # Updates are deltas, so wait for the last one to be sent rather than letting the outbox merge two of them.
+        if ctx.slot is None or ctx.tracker_feed is None or len(ctx.outbox):
+            continue
+        if ctx.logic_tracker is not None:
+            inventory = dict(ctx.logic_tracker.items)
+        else:
+            inventory = Counter(LOOKUP_ID_TO_NAME[item.item] for item in ctx.items_rcvd.items if item is not None)
+        update = ctx.tracker_feed.update(
+            ctx.last_flag_snapshot,
+            location_bitset(ctx.checked_locations | ctx.locations_checked),
+            inventory,
+            ctx.current_stage_name,
+        )
+        if update is not None:
+            ctx.outbox.queue({"cmd": "Bounce", "slots": [ctx.slot], "data": {TRACKER_FEED_KEY: update}})
+            ctx.outbox.flush(ctx.send_msgs)
+
+
+async def resolve_slot_name(ctx: SSContext) -> None:
+    """
+    Read the slot name from the game, and log in to the server with it if the server is already waiting for it.
+    The slot name is part of the patched game, so it can be read as soon as Dolphin is hooked, before the player loads
+    a file.
+
+    :param ctx: The SS client context.
+    """
+    slot_name = dme_read_slot()
+    if not slot_name:
+        return
+    if not ctx.auth:
+        ctx.auth = slot_name
+    if ctx.awaiting_rom:
+        ctx.awaiting_rom = False
+        await ctx.server_auth()
+
+
 async def dolphin_sync_task(ctx: SSContext) -> None:
     """
     Manages the connection to Dolphin.
 
     While connected, read the emulator's memory to look for any relevant changes made by the player in the game.
+    Hooking is retried with exponential backoff. Losing Dolphin doesn't end the server session, so the client picks up
+    where it left off once Dolphin is back.
 
     :param ctx: The SS client context.
     """
     logger.info("Connecting to Dolphin. Use /dolphin for status information.")
+    hook_delay = DOLPHIN_HOOK_MIN_DELAY
     while not ctx.exit_event.is_set():
+        # Send anything queued since the last iteration, including while not in-game or not hooked.
+        ctx.outbox.flush(ctx.send_msgs)
         try:
             if (
-                dolphin_memory_engine.is_hooked()
+                dme_backend.is_hooked()
                 and ctx.dolphin_status == CONNECTION_CONNECTED_STATUS
             ):
+                hook_delay = DOLPHIN_HOOK_MIN_DELAY
+                # Count the reads of ticks that run the jobs, to compare them per tick.
+                reads, bytes_read = dme_read_counts()
+                with ctx.perf.time("reads"):
+                    # Only read the flag block on ticks where the locations are checked.
+                    await dme_prefetch(
+                        ctx, flags=ctx.slot is not None and ctx.sync_scheduler.is_due(ctx, "locations")
+                    )
+                if ctx.trace_recorder is not None:
+                    ctx.trace_recorder.record(dme_read_view)
+                if ctx.slot is None:
+                    await resolve_slot_name(ctx)
                 if not check_ingame(check_in_ffw(ctx)):
                     # Reset the give item array while not in the game.
                     # dolphin_memory_engine.write_bytes(ARCHIPELAGO_ARRAY_ADDR, bytes([0xFF] * ctx.len_give_item_array))
-                    await asyncio.sleep(0.1)
+                    # Back off while not in the game.
+                    await dme_sleep(ctx.sync_scheduler.pause())
                     continue
                 if ctx.slot is not None:
-                    if "DeathLink" in ctx.tags:
-                        await check_death(ctx)
-                    await give_items(ctx)
-                    await check_locations(ctx)
-                    await check_current_stage_changed(ctx)
+                    if check_on_title_screen():
+                        # Nothing can be sent or received from the title screen, so back off there too.
+                        delay = ctx.sync_scheduler.pause()
+                    else:
+                        delay = await ctx.sync_scheduler.run(ctx)
+                        tick_reads, tick_bytes_read = dme_read_counts()
+                        ctx.perf.record_tick(tick_reads - reads, tick_bytes_read - bytes_read)
+                    # Send everything queued during this tick in one frame.
+                    ctx.outbox.flush(ctx.send_msgs)
+                    await dme_sleep(delay)
                 else:
-                    if not ctx.auth:
-                        ctx.auth = dme_read_slot()
-                    if ctx.awaiting_rom:
-                        await ctx.server_auth()
-                await asyncio.sleep(0.1)
+                    await dme_sleep(0.1)
             else:
                 if ctx.dolphin_status == CONNECTION_CONNECTED_STATUS:
                     logger.info("Connection to Dolphin lost, reconnecting...")
                     ctx.dolphin_status = CONNECTION_LOST_STATUS
-                logger.info("Attempting to connect to Dolphin...")
-                dolphin_memory_engine.hook()
-                if dolphin_memory_engine.is_hooked():
-                    if dme_read_string(0x80000000, 6) != "SOUE01":
+                if hook_delay == DOLPHIN_HOOK_MIN_DELAY:
+                    logger.info("Attempting to connect to Dolphin...")
+                if await dme_hook():
+                    await dme_prefetch_fields("game_id", "slot_name")
+                    if dme_read_field("game_id") != SS_GAME_ID:
                         logger.info(CONNECTION_REFUSED_GAME_STATUS)
                         ctx.dolphin_status = CONNECTION_REFUSED_GAME_STATUS
-                        dolphin_memory_engine.un_hook()
-                        await asyncio.sleep(5)
+                        await dme_worker.run(dme_backend.un_hook)
+                        await asyncio.sleep(hook_delay)
+                        hook_delay = min(hook_delay * 2, DOLPHIN_HOOK_MAX_DELAY)
                     else:
                         logger.info(CONNECTION_CONNECTED_STATUS)
                         ctx.dolphin_status = CONNECTION_CONNECTED_STATUS
-                        ctx.locations_checked = set()
+                        slot_name = dme_read_slot()
+                        if ctx.auth and slot_name and slot_name != ctx.auth:
+                            # A different seed's game was loaded, so log in again as its slot.
+                            logger.info(f"Dolphin is now running {slot_name}'s game, reconnecting to the server...")
+                            await ctx.disconnect(allow_autoreconnect=True)
+                        ctx.reset_location_checks()
+                        ctx.restore_client_state()
                 else:
-                    logger.info(
-                        "Connection to Dolphin failed, attempting again in 5 seconds..."
-                    )
+                    logger.info(f"Connection to Dolphin failed, attempting again in {hook_delay:g} seconds...")
                     ctx.dolphin_status = CONNECTION_LOST_STATUS
-                    await ctx.disconnect()
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(hook_delay)
+                    hook_delay = min(hook_delay * 2, DOLPHIN_HOOK_MAX_DELAY)
                     continue
         except Exception:
-            dolphin_memory_engine.un_hook()
-            logger.info(
-                "Connection to Dolphin failed, attempting again in 5 seconds..."
-            )
+            await dme_worker.run(dme_backend.un_hook)
+            logger.info(f"Connection to Dolphin failed, attempting again in {hook_delay:g} seconds...")
             logger.error(traceback.format_exc())
             ctx.dolphin_status = CONNECTION_LOST_STATUS
-            await ctx.disconnect()
-            await asyncio.sleep(5)
+            await asyncio.sleep(hook_delay)
+            hook_delay = min(hook_delay * 2, DOLPHIN_HOOK_MAX_DELAY)
             continue
 
 
-def main(connect: Optional[str] = None, password: Optional[str] = None) -> None:
+def main(
+    connect: Optional[str] = None,
+    password: Optional[str] = None,
+    dolphin_shm: Optional[str] = None,
+    record_trace: Optional[str] = None,
+    perf_log: Optional[str] = None,
+    tracker_feed: Optional[float] = None,
+) -> None:
     """
     Run the main async loop for the SS client.
 
     :param connect: Address of the Archipelago server.
     :param password: Password for server authentication.
+    :param dolphin_shm: Path of Dolphin's shared memory object to map instead of using dolphin_memory_engine, or "auto"
+        to find it. Only available on Linux.
+    :param record_trace: Path of a file to record the flags and Link's state to, for replaying with `Client.Trace`.
+    :param perf_log: Path of a JSON lines file to periodically append the client's performance statistics to.
+    :param tracker_feed: Most tracker feed updates to send per second, or `None` not to publish the tracker feed.
     """
     Utils.init_logging("Skyward Sword Client")
+    if dolphin_shm:
+        use_shared_memory(None if dolphin_shm == "auto" else dolphin_shm)
 
     async def _main(connect: Optional[str], password: Optional[str]) -> None:
         ctx = SSContext(connect, password)
-        ctx.server_task = asyncio.create_task(server_loop(ctx), name="ServerLoop")
-        if gui_enabled:
-            ctx.run_gui()
-        ctx.run_cli()
-        await asyncio.sleep(1)
+        if record_trace:
+            from .Client.Trace import SSTraceRecorder
 
+            ctx.trace_recorder = SSTraceRecorder(record_trace)
+        # Hook into Dolphin and connect to the server at the same time. Whichever finishes last logs in to the server.
+        ctx.server_task = asyncio.create_task(server_loop(ctx), name="ServerLoop")
         ctx.dolphin_sync_task = asyncio.create_task(
             dolphin_sync_task(ctx), name="DolphinSync"
         )
+        ctx.item_delivery_task = asyncio.create_task(
+            item_delivery_task(ctx), name="ItemDelivery"
+        )
+        perf_log_writer = (
+            asyncio.create_task(perf_log_task(ctx, perf_log), name="PerfLog") if perf_log else None
+        )
+        feed_publisher = None
+        if tracker_feed:
+            ctx.tracker_feed = SSTrackerFeed()
+            feed_publisher = asyncio.create_task(tracker_feed_task(ctx, tracker_feed), name="TrackerFeed")
+        if gui_enabled:
+            ctx.run_gui()
+        ctx.run_cli()
 
         await ctx.exit_event.wait()
         ctx.server_address = None
@@ -686,6 +1523,20 @@ def main(connect: Optional[str] = None, password: Optional[str] = None) -> None:
             await asyncio.sleep(3)
             await ctx.dolphin_sync_task
 
+        if ctx.item_delivery_task:
+            await ctx.item_delivery_task
+
+        if perf_log_writer:
+            await perf_log_writer
+
+        if feed_publisher:
+            await feed_publisher
+
+        if ctx.trace_recorder is not None:
+            ctx.trace_recorder.close()
+
+        dme_worker.shutdown()
+
     import colorama
 
     colorama.init()
@@ -695,5 +1546,28 @@ def main(connect: Optional[str] = None, password: Optional[str] = None) -> None:
 
 if __name__ == "__main__":
     parser = get_base_parser()
+    parser.add_argument(
+        "--dolphin-shm",
+        default=None,
+        help="Map Dolphin's shared memory object (e.g. /dev/shm/dolphin-emu.1234, or 'auto' to find it) instead of "
+        "using dolphin_memory_engine. Linux only.",
+    )
+    parser.add_argument(
+        "--record-trace",
+        default=None,
+        help="Record the flags and Link's state to this file, for replaying with Client.Trace.",
+    )
+    parser.add_argument(
+        "--perf-log",
+        default=None,
+        help="Periodically append the client's performance statistics to this JSON lines file.",
+    )
+    parser.add_argument(
+        "--tracker-feed",
+        type=float,
+        default=None,
+        help="Publish inventory, checked locations and the current stage to trackers over Bounce, at most this many "
+        "times per second.",
+    )
     args = parser.parse_args()
-    main(args.connect, args.password)
+    main(args.connect, args.password, args.dolphin_shm, args.record_trace, args.perf_log, args.tracker_feed)
@@ -120,7 +120,7 @@ class SSWorld(World):
     topology_present: bool = True
     web = SSWeb()
     required_client_version: tuple[int, int, int] = (0, 5, 1)
-    origin_region_name: str = "Upper Skyloft"
+    origin_region_name: str = ORIGIN_REGION
 
     item_name_to_id: ClassVar[dict[str, int]] = {
         name: SSItem.get_apid(data.code)
@@ -278,20 +278,7 @@ class SSWorld(World):
                 )
 
         for dun, conn in self.entrances.dungeon_connections.items():
-            if conn == "dungeon_entrance_in_deep_woods":
-                dun_entrance_region = "Faron Woods"
-            elif conn == "dungeon_entrance_in_lake_floria":
-                dun_entrance_region = "Lake Floria"
-            elif conn == "dungeon_entrance_in_eldin_volcano":
-                dun_entrance_region = "Eldin Volcano"
-            elif conn == "dungeon_entrance_in_volcano_summit":
-                dun_entrance_region = "Volcano Summit"
-            elif conn == "dungeon_entrance_in_lanayru_desert":
-                dun_entrance_region = "Lanayru Desert"
-            elif conn == "dungeon_entrance_in_lanayru_sand_sea":
-                dun_entrance_region = "Lanayru Sand Sea"
-            elif conn == "dungeon_entrance_on_skyloft":
-                dun_entrance_region = "Central Skyloft"
+            dun_entrance_region = DUNGEON_ENTRANCE_REGIONS[conn]
 
             apreg = Region(dun, self.player, self.multiworld)
             apreg.connect(self.get_region(dun_entrance_region))
@@ -305,14 +292,7 @@ class SSWorld(World):
             )
 
         for trl, conn in self.entrances.trial_connections.items():
-            if conn == "trial_gate_on_skyloft":
-                trl_gate_region = "Central Skyloft"
-            elif conn == "trial_gate_in_faron_woods":
-                trl_gate_region = "Faron Woods"
-            elif conn == "trial_gate_in_eldin_volcano":
-                trl_gate_region = "Eldin Volcano"
-            elif conn == "trial_gate_in_lanayru_desert":
-                trl_gate_region = "Lanayru Desert"
+            trl_gate_region = TRIAL_GATE_REGIONS[conn]
 
             apreg = Region(trl, self.player, self.multiworld)
             apreg.connect(self.get_region(trl_gate_region))
@@ -541,6 +521,12 @@ class SSWorld(World):
             "starting_items": self.options.starting_items.value,
             "death_link": self.options.death_link.value,
             "locations_for_hint": self.hint_data.locations_for_hint,
+            # Used by the client's logic tracker.
+            "required_dungeons": self.dungeons.required_dungeons,
+            "dungeon_connections": self.entrances.dungeon_connections,
+            "trial_connections": self.entrances.trial_connections,
+            "precollected_items": self.starting_items,
+            "give_item_array_length": GIVE_ITEM_ARRAY_LENGTH,
         }
 
         return slot_data